@@ -141,6 +141,34 @@ async def get_sync_stats(
 # because {slug:path} would otherwise capture "slug/prices" as the slug
 
 
+@router.get(
+    "/resolve",
+    response_model=MarketDetailResponse,
+    summary="Get market by slug or condition ID",
+)
+async def resolve_market(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    key: str = Query(..., min_length=1, description="Market slug or condition ID"),
+    market_service: MarketService = Depends(get_market_service),
+    force_refresh: bool = Query(False, description="Force fetch from Polymarket API"),
+):
+    """
+    Get market details from either its slug or its condition ID.
+    
+    Saves clients a second round trip when they do not know which kind of
+    identifier they hold. Lazy-loads from Polymarket API if not cached.
+    """
+    market = await market_service.resolve_market(key, force_refresh=force_refresh)
+    
+    if not market:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Market '{key}' not found",
+        )
+    
+    return market
+
+
 @router.get(
     "/by-slug/{slug:path}/prices",
     response_model=PriceHistoryResponse,
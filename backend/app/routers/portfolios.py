@@ -1,10 +1,11 @@
 """
 Portfolios router for portfolio and trade management.
 """
+import hashlib
 from datetime import datetime
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from app.database.connections import get_mongo_client
 from app.database.databases import trading_db, markets_db
@@ -15,6 +16,8 @@ from app.schemas.portfolio import (
     PortfolioUpdate,
     PortfolioResponse,
     PortfolioWithPositions,
+    PortfolioSummary,
+    PositionAggregate,
     PortfolioMetrics,
     MarkToMarketResponse,
 )
@@ -33,6 +36,19 @@ async def get_portfolio_service() -> PortfolioService:
     return PortfolioService(db, markets_db_instance)
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    
+    The header may list several tags or be `*`; tags are compared weakly,
+    ignoring any `W/` prefix.
+    """
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
 # ==================== Portfolio CRUD ====================
 
 
@@ -104,6 +120,68 @@ async def get_portfolio(
     return portfolio
 
 
+@router.get(
+    "/{portfolio_id}/summary",
+    response_model=PortfolioSummary,
+    summary="Get portfolio summary",
+)
+async def get_portfolio_summary(
+    portfolio_id: str,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+):
+    """
+    Get portfolio totals and open positions valued at current market prices.
+    
+    Returns everything the portfolio page needs in one response: cash,
+    exposure, total value, performance and per-position cost basis.
+    
+    Requires valid token as query parameter: `?token=xxx`
+    """
+    summary = await portfolio_service.get_portfolio_summary(
+        portfolio_id, current_user.id
+    )
+    
+    if not summary:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found",
+        )
+    
+    return summary
+
+
+@router.get(
+    "/{portfolio_id}/positions",
+    response_model=list[PositionAggregate],
+    summary="Get aggregated positions",
+)
+async def get_positions(
+    portfolio_id: str,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    open_only: bool = Query(False, description="Only return positions with quantity held"),
+    market_id: Optional[list[str]] = Query(None, description="Only return positions on these markets (repeatable)"),
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+):
+    """
+    Get net quantity, notional, trade count and cost basis per
+    (market, outcome), aggregated server-side over all trades.
+    
+    Requires valid token as query parameter: `?token=xxx`
+    """
+    positions = await portfolio_service.get_positions(
+        portfolio_id, current_user.id, open_only=open_only, market_ids=market_id
+    )
+    
+    if positions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found",
+        )
+    
+    return positions
+
+
 @router.patch(
     "/{portfolio_id}",
     response_model=PortfolioResponse,
@@ -205,6 +283,8 @@ async def add_trade(
 )
 async def get_trades(
     portfolio_id: str,
+    request: Request,
+    response: Response,
     current_user: Annotated[User, Depends(get_current_active_user)],
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
@@ -220,9 +300,12 @@ async def get_trades(
     - **start_date**: Optional start date filter
     - **end_date**: Optional end date filter
     
+    The response carries an `ETag` header. Send it back in `If-None-Match`
+    to get an empty `304 Not Modified` when the page has not changed.
+    
     Requires valid token as query parameter: `?token=xxx`
     """
-    return await portfolio_service.get_trades(
+    history = await portfolio_service.get_trades(
         portfolio_id=portfolio_id,
         user_id=current_user.id,
         page=page,
@@ -230,6 +313,13 @@ async def get_trades(
         start_date=start_date,
         end_date=end_date,
     )
+    
+    etag = '"' + hashlib.sha1(history.model_dump_json().encode()).hexdigest() + '"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    return history
 
 
 # ==================== Metrics ====================
@@ -2,9 +2,9 @@
 WebSocket router for real-time live data streaming.
 """
 import asyncio
-import json
 from typing import Optional
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, status
 from jose import JWTError
 
@@ -17,6 +17,11 @@ from app.services.cache import CacheService
 router = APIRouter(tags=["WebSocket"])
 
 
+def encode_message(message: dict) -> str:
+    """Encode a message as compact UTF-8 JSON text, like WebSocket.send_json."""
+    return orjson.dumps(message).decode()
+
+
 class ConnectionManager:
     """
     Manages active WebSocket connections.
@@ -27,50 +32,79 @@ class ConnectionManager:
         self.active_connections: dict[str, WebSocket] = {}
         # Map of user_id -> subscribed market_ids
         self.subscriptions: dict[str, set[str]] = {}
+        # Map of market_id -> subscribed user_ids, the reverse of subscriptions
+        self.market_subscribers: dict[str, set[str]] = {}
     
     async def connect(self, websocket: WebSocket, user_id: str) -> None:
         """Accept connection and register user."""
         await websocket.accept()
+        self._drop_subscriptions(user_id)
         self.active_connections[user_id] = websocket
         self.subscriptions[user_id] = set()
     
     def disconnect(self, user_id: str) -> None:
         """Remove user connection and subscriptions."""
         self.active_connections.pop(user_id, None)
-        self.subscriptions.pop(user_id, None)
+        self._drop_subscriptions(user_id)
+    
+    def _drop_subscriptions(self, user_id: str) -> None:
+        """Remove a user's subscriptions from both maps."""
+        for market_id in self.subscriptions.pop(user_id, ()):
+            self._remove_subscriber(market_id, user_id)
+    
+    def _remove_subscriber(self, market_id: str, user_id: str) -> None:
+        """Remove a user from a market's subscribers, dropping empty sets."""
+        subscribers = self.market_subscribers.get(market_id)
+        if subscribers is not None:
+            subscribers.discard(user_id)
+            if not subscribers:
+                del self.market_subscribers[market_id]
     
     def subscribe(self, user_id: str, market_ids: list[str]) -> None:
         """Subscribe user to market updates."""
         if user_id in self.subscriptions:
             self.subscriptions[user_id].update(market_ids)
+            for market_id in market_ids:
+                self.market_subscribers.setdefault(market_id, set()).add(user_id)
     
     def unsubscribe(self, user_id: str, market_ids: list[str]) -> None:
         """Unsubscribe user from market updates."""
         if user_id in self.subscriptions:
             self.subscriptions[user_id].difference_update(market_ids)
+            for market_id in market_ids:
+                self._remove_subscriber(market_id, user_id)
     
-    def get_subscribed_users(self, market_id: str) -> list[str]:
+    def get_subscribed_users(self, market_id: str) -> frozenset[str]:
         """Get all users subscribed to a market."""
-        return [
-            user_id for user_id, markets in self.subscriptions.items()
-            if market_id in markets
-        ]
+        return frozenset(self.market_subscribers.get(market_id, ()))
     
-    async def send_to_user(self, user_id: str, message: dict) -> bool:
-        """Send message to specific user."""
+    async def _send_text(self, user_id: str, text: str) -> bool:
+        """Send an already encoded message to a specific user."""
         websocket = self.active_connections.get(user_id)
         if websocket:
             try:
-                await websocket.send_json(message)
+                await websocket.send_text(text)
                 return True
             except Exception:
                 return False
         return False
     
+    async def send_to_user(self, user_id: str, message: dict) -> bool:
+        """Send message to specific user."""
+        return await self._send_text(user_id, encode_message(message))
+    
     async def broadcast_to_market(self, market_id: str, message: dict) -> None:
-        """Broadcast message to all users subscribed to a market."""
-        for user_id in self.get_subscribed_users(market_id):
-            await self.send_to_user(user_id, message)
+        """
+        Broadcast message to all users subscribed to a market.
+        
+        The message is encoded once and the same text is sent to every
+        subscriber concurrently.
+        """
+        user_ids = self.get_subscribed_users(market_id)
+        if not user_ids:
+            return
+        text = encode_message(message)
+        await asyncio.gather(*(self._send_text(user_id, text) for user_id in user_ids))
 
 
 # Global connection manager
@@ -149,11 +183,11 @@ async def websocket_live_data(
     # Accept connection
     await manager.connect(websocket, user_id)
     
-    await websocket.send_json({
+    await websocket.send_text(encode_message({
         "type": "connected",
         "user_id": user_id,
         "message": "Connected to live data stream",
-    })
+    }))
     
     # Start background task to push live data
     push_task = asyncio.create_task(push_live_data(user_id, websocket))
@@ -161,7 +195,7 @@ async def websocket_live_data(
     try:
         while True:
             # Receive and handle client messages
-            data = await websocket.receive_json()
+            data = orjson.loads(await websocket.receive_text())
             
             action = data.get("action")
             
@@ -169,36 +203,36 @@ async def websocket_live_data(
                 market_ids = data.get("market_ids", [])
                 if market_ids:
                     manager.subscribe(user_id, market_ids)
-                    await websocket.send_json({
+                    await websocket.send_text(encode_message({
                         "type": "subscribed",
                         "market_ids": market_ids,
-                    })
+                    }))
             
             elif action == "unsubscribe":
                 market_ids = data.get("market_ids", [])
                 if market_ids:
                     manager.unsubscribe(user_id, market_ids)
-                    await websocket.send_json({
+                    await websocket.send_text(encode_message({
                         "type": "unsubscribed",
                         "market_ids": market_ids,
-                    })
+                    }))
             
             elif action == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_text(encode_message({"type": "pong"}))
             
             else:
-                await websocket.send_json({
+                await websocket.send_text(encode_message({
                     "type": "error",
                     "message": f"Unknown action: {action}",
-                })
+                }))
     
     except WebSocketDisconnect:
         pass
     except Exception as e:
-        await websocket.send_json({
+        await websocket.send_text(encode_message({
             "type": "error",
             "message": str(e),
-        })
+        }))
     finally:
         # Cleanup
         push_task.cancel()
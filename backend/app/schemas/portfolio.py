@@ -60,6 +60,40 @@ class PortfolioWithPositions(PortfolioResponse):
     total_pnl_percent: float = Field(..., description="Total P&L as percentage")
 
 
+class PositionAggregate(BaseModel):
+    """Net position of a (market, outcome) pair aggregated from trades."""
+    market_id: str = Field(..., description="Market identifier")
+    outcome: str = Field(..., description="Outcome traded")
+    quantity: float = Field(..., description="Net quantity (buys minus sells)")
+    notional: float = Field(..., description="Signed quantity times price, summed")
+    trade_count: int = Field(..., description="Number of trades")
+    cost_basis: float = Field(..., description="Remaining average cost basis")
+
+
+class PositionSummary(BaseModel):
+    """Open position valued at the current market price."""
+    market: str = Field(..., description="Market identifier")
+    market_question: str = Field(..., description="Market question for display")
+    outcome: str = Field(..., description="Outcome held")
+    qty: float = Field(..., description="Net quantity held")
+    current_price: float = Field(..., description="Current price (average entry price if unknown)")
+    cost_basis: float = Field(..., description="Remaining average cost basis")
+    current_value: float = Field(..., description="Quantity times current price")
+    performance: float = Field(..., description="Return on cost basis in percent")
+
+
+class PortfolioSummary(BaseModel):
+    """Pre-aggregated portfolio card and detail data."""
+    portfolio_id: str
+    name: str
+    initial_balance: float
+    cash_balance: float
+    total_exposure: float = Field(..., description="Current value of open positions")
+    total_value: float = Field(..., description="Cash plus open positions")
+    performance: float = Field(..., description="Total return on initial balance in percent")
+    positions: list[PositionSummary] = Field(default=[], description="Open positions")
+
+
 class PnLDataPoint(BaseModel):
     """Single P&L data point for charts."""
     timestamp: datetime
@@ -15,7 +15,7 @@ from pymongo import UpdateOne
 
 from app.database.databases import markets_db
 from app.models.market import MarketMetadata, PriceHistory, OpenInterest
-from app.services.polymarket_api import get_polymarket_api
+from app.services.polymarket_api import PolymarketAPI, get_polymarket_api
 from app.schemas.market import (
     MarketSummary,
     MarketDetailResponse,
@@ -29,12 +29,19 @@ from app.schemas.market import (
 class MarketService:
     """Service for market data with lazy-loading from Polymarket API."""
     
-    def __init__(self, db: AsyncIOMotorDatabase):
-        """Initialize with markets database."""
+    def __init__(self, db: AsyncIOMotorDatabase, polymarket_api: Optional[PolymarketAPI] = None):
+        """Initialize with markets database and optional Polymarket client."""
         self.db = db
         self.markets_col = db[markets_db.Collections.MARKETS]
         self.price_history_col = db[markets_db.Collections.PRICE_HISTORY]
         self.open_interest_col = db[markets_db.Collections.OPEN_INTEREST]
+        self.polymarket_api = polymarket_api
+    
+    async def _get_api(self) -> PolymarketAPI:
+        """Return the injected Polymarket client, or the shared one."""
+        if self.polymarket_api is not None:
+            return self.polymarket_api
+        return await get_polymarket_api()
     
     # ==================== Market Metadata ====================
     
@@ -60,7 +67,7 @@ class MarketService:
                 return self._doc_to_detail_response(doc)
         
         # Fetch from Polymarket API
-        api = await get_polymarket_api()
+        api = await self._get_api()
         market_data = await api.get_market_by_slug(slug)
         
         if not market_data:
@@ -92,7 +99,7 @@ class MarketService:
                 return self._doc_to_detail_response(doc)
         
         # Fetch from Polymarket API
-        api = await get_polymarket_api()
+        api = await self._get_api()
         market_data = await api.get_market_by_condition_id(condition_id)
         
         if not market_data:
@@ -102,6 +109,46 @@ class MarketService:
         await self._cache_market(market_data)
         return self._market_data_to_detail_response(market_data)
     
+    async def resolve_market(
+        self,
+        key: str,
+        force_refresh: bool = False,
+    ) -> Optional[MarketDetailResponse]:
+        """
+        Get market by slug or condition ID with lazy-loading.
+        
+        The cache is checked with a single query on both fields. On a miss
+        the key is looked up on the Polymarket API as a slug, then as a
+        condition ID.
+        
+        Args:
+            key: Market slug or on-chain condition ID
+            force_refresh: Force fetch from API even if cached
+            
+        Returns:
+            MarketDetailResponse or None
+        """
+        # Check cache first
+        if not force_refresh:
+            doc = await self.markets_col.find_one(
+                {"$or": [{"slug": key}, {"condition_id": key}]}
+            )
+            if doc:
+                return self._doc_to_detail_response(doc)
+        
+        # Fetch from Polymarket API
+        api = await self._get_api()
+        market_data = await api.get_market_by_slug(key)
+        if not market_data:
+            market_data = await api.get_market_by_condition_id(key)
+        
+        if not market_data:
+            return None
+        
+        # Cache and return
+        await self._cache_market(market_data)
+        return self._market_data_to_detail_response(market_data)
+    
     async def list_markets(
         self,
         filters: MarketFilterParams,
@@ -248,7 +295,7 @@ class MarketService:
         
         # If no token IDs in cache, fetch market from API directly
         if not clob_token_ids:
-            api = await get_polymarket_api()
+            api = await self._get_api()
             market_data = await api.get_market_by_slug(slug)
             if not market_data:
                 return None
@@ -303,7 +350,7 @@ class MarketService:
         if last_fetched_at and last_fetched_at.tzinfo is None:
             last_fetched_at = last_fetched_at.replace(tzinfo=timezone.utc)
         
-        api = await get_polymarket_api()
+        api = await self._get_api()
         now = datetime.now(timezone.utc)
         
         # Determine if we need to fetch new data
@@ -455,7 +502,7 @@ class MarketService:
         
         if to_fetch:
             # Fetch from Data API
-            api = await get_polymarket_api()
+            api = await self._get_api()
             oi_data = await api.get_open_interest(to_fetch)
             
             # Cache and add to results
@@ -16,7 +16,10 @@ from app.schemas.portfolio import (
     PortfolioUpdate,
     PortfolioResponse,
     PortfolioWithPositions,
+    PortfolioSummary,
     Position,
+    PositionAggregate,
+    PositionSummary,
     PortfolioMetrics,
     PnLDataPoint,
     PositionPnLHistory,
@@ -283,6 +286,202 @@ class PortfolioService:
             total_pnl_percent=total_pnl_percent,
         )
     
+    async def _get_market_docs(self, market_ids: list[str]) -> dict[str, dict]:
+        """
+        Find cached markets by slug or condition ID in a single query.
+        
+        Returns a dict keyed by the requested IDs that matched; a slug match
+        wins over a condition ID match.
+        """
+        if self.markets_col is None or not market_ids:
+            return {}
+        
+        try:
+            cursor = self.markets_col.find(
+                {"$or": [
+                    {"slug": {"$in": market_ids}},
+                    {"condition_id": {"$in": market_ids}},
+                ]},
+                {"slug": 1, "condition_id": 1, "question": 1, "outcomes": 1, "outcome_prices": 1},
+            )
+            docs = await cursor.to_list(length=None)
+        except Exception:
+            return {}
+        
+        wanted = set(market_ids)
+        by_id: dict[str, dict] = {}
+        for doc in docs:
+            if doc.get("slug") in wanted:
+                by_id[doc["slug"]] = doc
+        for doc in docs:
+            condition_id = doc.get("condition_id")
+            if condition_id in wanted:
+                by_id.setdefault(condition_id, doc)
+        return by_id
+    
+    @staticmethod
+    def _price_by_outcome(market_doc: dict) -> dict[str, Optional[float]]:
+        """Map normalized outcome names to prices; first occurrence wins."""
+        prices: dict[str, Optional[float]] = {}
+        for outcome, price in zip(
+            market_doc.get("outcomes") or [], market_doc.get("outcome_prices") or []
+        ):
+            key = (outcome or "").strip().lower()
+            if key in prices:
+                continue
+            try:
+                prices[key] = float(price)
+            except (ValueError, TypeError):
+                prices[key] = None
+        return prices
+    
+    async def _aggregate_positions(
+        self,
+        portfolio_id: str,
+        open_only: bool = False,
+        market_ids: Optional[list[str]] = None,
+    ) -> list[dict]:
+        """
+        Group a portfolio's trades by (market_id, outcome) in MongoDB.
+        
+        Quantity, notional and trade count are summed by `$group`. Cost basis
+        depends on trade order, so each group also carries its fills oldest
+        first and the average cost method is applied to those: buys add to
+        the cost, sells remove quantity at the average cost per unit (never
+        below zero). Groups are returned in order of their first trade.
+        
+        With `open_only`, groups with no quantity held are dropped in the
+        pipeline, before any fills are sent back. With `market_ids`, only
+        trades on those markets are read.
+        """
+        match = {"portfolio_id": portfolio_id}
+        if market_ids:
+            match["market_id"] = {"$in": market_ids}
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"trade_timestamp": 1}},
+            {"$addFields": {"signed_qty": {"$cond": [
+                {"$eq": ["$side", "buy"]},
+                "$quantity",
+                {"$multiply": ["$quantity", -1]},
+            ]}}},
+            {"$group": {
+                "_id": {"market_id": "$market_id", "outcome": "$outcome"},
+                "quantity": {"$sum": "$signed_qty"},
+                "notional": {"$sum": {"$multiply": ["$signed_qty", "$price"]}},
+                "trade_count": {"$sum": 1},
+                "first_trade": {"$min": "$trade_timestamp"},
+                "fills": {"$push": {"side": "$side", "quantity": "$quantity", "price": "$price"}},
+            }},
+            {"$sort": {"first_trade": 1}},
+        ]
+        if open_only:
+            pipeline.insert(-1, {"$match": {"quantity": {"$gt": 0}}})
+        groups = await self.trades.aggregate(pipeline).to_list(length=None)
+        
+        positions = []
+        for group in groups:
+            held = 0.0
+            cost = 0.0
+            for fill in group["fills"]:
+                qty = fill["quantity"]
+                if fill["side"] == "buy":
+                    cost += qty * fill["price"]
+                    held += qty
+                else:
+                    if held > 0:
+                        cost = max(cost - qty * (cost / held), 0.0)
+                    held -= qty
+            positions.append({
+                "market_id": group["_id"]["market_id"],
+                "outcome": group["_id"]["outcome"],
+                "quantity": group["quantity"],
+                "notional": group["notional"],
+                "trade_count": group["trade_count"],
+                "cost_basis": cost,
+            })
+        return positions
+    
+    async def get_positions(
+        self,
+        portfolio_id: str,
+        user_id: str,
+        open_only: bool = False,
+        market_ids: Optional[list[str]] = None,
+    ) -> Optional[list[PositionAggregate]]:
+        """Get net positions per (market_id, outcome), optionally open ones or some markets only."""
+        portfolio = await self.get_portfolio(portfolio_id, user_id)
+        if not portfolio:
+            return None
+        
+        aggregates = await self._aggregate_positions(
+            portfolio_id, open_only=open_only, market_ids=market_ids
+        )
+        return [PositionAggregate(**pos) for pos in aggregates]
+    
+    async def get_portfolio_summary(
+        self, portfolio_id: str, user_id: str
+    ) -> Optional[PortfolioSummary]:
+        """
+        Get a portfolio with its open positions valued at current prices.
+        
+        Cost basis follows the average cost method: buys add to it and sells
+        remove quantity at the average cost per unit (never below zero).
+        Positions without a known market price are valued at their average
+        entry price.
+        """
+        portfolio = await self.get_portfolio(portfolio_id, user_id)
+        if not portfolio:
+            return None
+        
+        aggregates = await self._aggregate_positions(portfolio_id, open_only=True)
+        
+        market_docs = await self._get_market_docs(
+            list({pos["market_id"] for pos in aggregates})
+        )
+        
+        positions = []
+        total_exposure = 0.0
+        for pos in aggregates:
+            market_id, outcome = pos["market_id"], pos["outcome"]
+            qty = pos["quantity"]
+            current_price = pos["notional"] / qty
+            market_question = market_id
+            market_doc = market_docs.get(market_id)
+            if market_doc:
+                market_question = market_doc.get("question") or market_id
+                price = self._price_by_outcome(market_doc).get(outcome.strip().lower())
+                if price is not None:
+                    current_price = price
+            
+            current_value = qty * current_price
+            total_exposure += current_value
+            cost_basis = pos["cost_basis"]
+            positions.append(PositionSummary(
+                market=market_id,
+                market_question=market_question,
+                outcome=outcome,
+                qty=qty,
+                current_price=current_price,
+                cost_basis=cost_basis,
+                current_value=current_value,
+                performance=((current_value - cost_basis) / cost_basis * 100) if cost_basis > 0 else 0,
+            ))
+        
+        initial_balance = portfolio.initial_balance
+        total_value = portfolio.cash_balance + total_exposure
+        
+        return PortfolioSummary(
+            portfolio_id=portfolio.id,
+            name=portfolio.name,
+            initial_balance=initial_balance,
+            cash_balance=portfolio.cash_balance,
+            total_exposure=total_exposure,
+            total_value=total_value,
+            performance=((total_value - initial_balance) / initial_balance * 100) if initial_balance > 0 else 0,
+            positions=positions,
+        )
+    
     async def calculate_metrics(
         self, portfolio_id: str, user_id: str, as_of: Optional[datetime] = None
     ) -> Optional[PortfolioMetrics]:
@@ -1,16 +1,35 @@
 import os
+import threading
 from datetime import datetime
 from typing import Optional
 
 import requests
 import streamlit as st
 
+# Trade history pages kept with their ETag per user session
+TRADES_ETAG_CACHE_SIZE = 16
+
 
 class APIClient:
-    """Simple API client for backend requests."""
+    """
+    Simple API client for backend requests.
+    
+    Each thread gets its own requests.Session, since sessions are not
+    thread-safe, and keeps its connections to the backend alive between
+    calls.
+    """
     
     def __init__(self, base_url: str):
         self.base_url = base_url
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """Return the calling thread's session, creating it on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
     
     def _headers(self) -> dict:
         """Get headers with auth token if available."""
@@ -34,7 +53,7 @@ class APIClient:
             except Exception:
                 return None
 
-    def _get(self, endpoint: str, params: Optional[dict] = None) -> dict:
+    def _get(self, endpoint: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> dict:
         """Make GET request."""
         try:
             if params is None:
@@ -42,13 +61,17 @@ class APIClient:
             # Add token as query param if available
             if st.session_state.token:
                 params["token"] = st.session_state.token
-            resp = requests.get(
+            resp = self.session.get(
                 f"{self.base_url}{endpoint}",
-                headers=self._headers(),
+                headers={**self._headers(), **(headers or {})},
                 params=params,
                 timeout=30,
             )
-            return {"status": resp.status_code, "data": self._parse_json(resp)}
+            result = {"status": resp.status_code, "data": self._parse_json(resp)}
+            etag = resp.headers.get("ETag")
+            if etag:
+                result["etag"] = etag
+            return result
         except requests.exceptions.ConnectionError:
             return {"status": 0, "error": "Cannot connect to backend"}
         except Exception as e:
@@ -62,7 +85,7 @@ class APIClient:
             # Add token as query param if available
             if st.session_state.token:
                 params["token"] = st.session_state.token
-            resp = requests.post(
+            resp = self.session.post(
                 f"{self.base_url}{endpoint}",
                 headers=self._headers(),
                 json=data,
@@ -149,6 +172,10 @@ class APIClient:
     def get_market_by_condition(self, condition_id: str) -> dict:
         """Get market by on-chain condition ID."""
         return self._get(f"/markets/by-condition/{condition_id}")
+
+    def resolve_market(self, key: str) -> dict:
+        """Get market by slug or condition ID in a single request."""
+        return self._get("/markets/resolve", {"key": key})
     
     def get_price_history(self, slug: str, outcome_index: int = 0) -> dict:
         """Get price history for market."""
@@ -180,6 +207,21 @@ class APIClient:
 
 
 
+    def get_portfolio_summary(self, portfolio_id: str) -> dict:
+        """Get portfolio totals and open positions valued at current prices."""
+        return self._get(f"/portfolios/{portfolio_id}/summary")
+
+    def get_positions(
+        self, portfolio_id: str, open_only: bool = False, market_ids: Optional[list] = None
+    ) -> dict:
+        """Get net positions per (market, outcome), aggregated server-side."""
+        params = {}
+        if open_only:
+            params["open_only"] = "true"
+        if market_ids:
+            params["market_id"] = list(market_ids)
+        return self._get(f"/portfolios/{portfolio_id}/positions", params or None)
+
     def get_portfolio_metrics(self, portfolio_id: str) -> dict:
         """Get portfolio performance metrics."""
         return self._get(f"/portfolios/{portfolio_id}/metrics")
@@ -198,8 +240,35 @@ class APIClient:
         return self._get(f"/portfolios/{portfolio_id}/mtm", {"resolution": resolution})
 
     def get_trades(self, portfolio_id: str, page: int = 1, page_size: int = 50) -> dict:
-        """Get trade history for a portfolio."""
-        return self._get(f"/portfolios/{portfolio_id}/trades", {"page": page, "page_size": page_size})
+        """
+        Get trade history for a portfolio.
+        
+        Responses are cached per page in session state together with their
+        ETag; when the backend answers 304 Not Modified the cached body is
+        returned instead of downloading the trades again. Only the most
+        recently used pages are kept.
+        """
+        cache = st.session_state.setdefault("trades_etag_cache", {})
+        cache_key = (portfolio_id, page, page_size)
+        # Re-insert on use so the dict's order is least recently used first
+        cached = cache.pop(cache_key, None)
+        if cached:
+            cache[cache_key] = cached
+        headers = {"If-None-Match": cached["etag"]} if cached else None
+        
+        result = self._get(
+            f"/portfolios/{portfolio_id}/trades",
+            {"page": page, "page_size": page_size},
+            headers=headers,
+        )
+        if result.get("status") == 304 and cached:
+            return {"status": 200, "data": cached["data"]}
+        if result.get("status") == 200 and result.get("etag"):
+            cache.pop(cache_key, None)
+            cache[cache_key] = {"etag": result["etag"], "data": result["data"]}
+            while len(cache) > TRADES_ETAG_CACHE_SIZE:
+                del cache[next(iter(cache))]
+        return result
     
     def delete_portfolio(self, portfolio_id: str) -> dict:
         """Delete a portfolio."""
@@ -208,7 +277,7 @@ class APIClient:
                 params = {"token": st.session_state.token}
             else:
                 params = {}
-            resp = requests.delete(
+            resp = self.session.delete(
                 f"{self.base_url}/portfolios/{portfolio_id}",
                 headers=self._headers(),
                 params=params,
@@ -255,4 +324,16 @@ class APIClient:
     
 
     def get_last_orderbookchange(self) -> dict:
-        return self._get("/market-stream/latest")
\ No newline at end of file
+        return self._get("/market-stream/latest")
+
+
+@st.cache_resource(show_spinner=False)
+def get_api_client(base_url: str) -> APIClient:
+    """
+    Return the process-wide APIClient for base_url, creating it once.
+    
+    Sharing one client between users is safe: the auth token is read from
+    the caller's session state on every request, and each thread, including
+    the _parallel_get and _prefetch workers, uses its own requests.Session.
+    """
+    return APIClient(base_url)
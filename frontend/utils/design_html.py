@@ -1,7 +1,10 @@
 
+import html
 import streamlit as st
 import pandas as pd
 import time
+from datetime import datetime
+from functools import lru_cache
 from utils.styles import COLORS
 from utils.formatters import format_number
 from utils.formatters import format_currency
@@ -11,6 +14,17 @@ from utils.formatters import time_until_end
 from utils.formatters import _display_name
 
 def render_portfolio_card(name, pid, performance, perf_class, perf_sign, total_value, cash_balance, total_exposure, initial_balance):
+    # Names are user input, escape before interpolating into HTML
+    name = html.escape(str(name))
+    pid = html.escape(str(pid))
+    # Format each figure once, outside the template
+    fmt = {
+        "total_value": format_currency(total_value),
+        "cash": format_currency(cash_balance),
+        "exposure": format_currency(total_exposure),
+        "pnl": format_currency(total_value - initial_balance),
+        "perf": f"{performance:.2f}",
+    }
     st.markdown(f"""
     <div class="portfolio-card">
         <div class="portfolio-header">
@@ -18,24 +32,24 @@ def render_portfolio_card(name, pid, performance, perf_class, perf_sign, total_v
                 <div class="portfolio-name">{name}</div>
                 <div class="portfolio-id">ID: {pid}</div>
             </div>
-            <div class="perf-badge {perf_class}">{perf_sign}{performance:.2f}%</div>
+            <div class="perf-badge {perf_class}">{perf_sign}{fmt["perf"]}%</div>
         </div>
         <div class="portfolio-metrics">
             <div class="metric-box">
                 <div class="metric-label">Total Value</div>
-                <div class="metric-value neutral">${total_value:,.2f}</div>
+                <div class="metric-value neutral">{fmt["total_value"]}</div>
             </div>
             <div class="metric-box">
                 <div class="metric-label">Available Cash</div>
-                <div class="metric-value">${cash_balance:,.2f}</div>
+                <div class="metric-value">{fmt["cash"]}</div>
             </div>
             <div class="metric-box">
                 <div class="metric-label">In Position</div>
-                <div class="metric-value">${total_exposure:,.2f}</div>
+                <div class="metric-value">{fmt["exposure"]}</div>
             </div>
             <div class="metric-box">
                 <div class="metric-label">P&L</div>
-                <div class="metric-value {perf_class}">{perf_sign}${total_value - initial_balance:,.2f}</div>
+                <div class="metric-value {perf_class}">{perf_sign}{fmt["pnl"]}</div>
             </div>
         </div>
     </div>
@@ -47,32 +61,41 @@ def render_position_card(pos, pid):
     market_display = pos.get("market_question", pos["market"])
     if len(market_display) > 60:
         market_display = market_display[:57] + "..."
+    market_display = html.escape(market_display)
+    outcome = html.escape(str(pos['outcome']))
+    fmt = {
+        "qty": f"{pos['qty']:.2f}",
+        "price": format_currency(pos['current_price'], 4),
+        "cost": format_currency(pos['cost_basis']),
+        "value": format_currency(pos['current_value']),
+        "perf": f"{pos['performance']:.1f}",
+    }
     st.markdown(f"""
     <div class="position-card">
         <div class="position-header">
             <div class="position-market">{market_display}</div>
-            <span class="position-outcome">{pos['outcome']}</span>
+            <span class="position-outcome">{outcome}</span>
         </div>
         <div class="position-metrics">
             <div class="metric-box">
                 <div class="metric-label">Quantity</div>
-                <div class="metric-value">{pos['qty']:.2f}</div>
+                <div class="metric-value">{fmt["qty"]}</div>
             </div>
             <div class="metric-box">
                 <div class="metric-label">Current Price</div>
-                <div class="metric-value">${pos['current_price']:.4f}</div>
+                <div class="metric-value">{fmt["price"]}</div>
             </div>
             <div class="metric-box">
                 <div class="metric-label">Cost</div>
-                <div class="metric-value">${pos['cost_basis']:.2f}</div>
+                <div class="metric-value">{fmt["cost"]}</div>
             </div>
             <div class="metric-box">
                 <div class="metric-label">Value</div>
-                <div class="metric-value">${pos['current_value']:.2f}</div>
+                <div class="metric-value">{fmt["value"]}</div>
             </div>
             <div class="metric-box">
                 <div class="metric-label">Performance</div>
-                <div class="metric-value {perf_class}">{perf_sign}{pos['performance']:.1f}%</div>
+                <div class="metric-value {perf_class}">{perf_sign}{fmt["perf"]}%</div>
             </div>
         </div>
     </div>
@@ -311,124 +334,94 @@ def render_html_table(
     st.markdown(html, unsafe_allow_html=True)
 
 
+# Card markup is fixed at import time; only the per-market fields vary
+_CARD_TEMPLATE = """
+<div class="market-card" id="card-{idx}">
+    <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 12px;">
+        <span style="font-size: 28px; font-weight: bold; color: {yes_color};">{yes_price}</span>
+        {badge}
+    </div>
+    <div style="font-size: 14px; color: TEXT_PRIMARY; margin-bottom: 12px; line-height: 1.4; min-height: 40px;">
+        {display_name}
+    </div>
+    <div style="display: flex; justify-content: space-between; color: TEXT_SECONDARY; font-size: 12px;">
+        <span>Vol: ${volume}</span>
+        <span>Liq: ${liquidity}</span>
+    </div>
+</div>
+""".strip().replace("TEXT_PRIMARY", COLORS["text_primary"]).replace("TEXT_SECONDARY", COLORS["text_secondary"])
+
+_BADGE_CLOSED = '<span class="badge-closed">Closed</span>'
+_BADGE_ACTIVE = '<span class="badge-active">{}</span>'
+
+
+@lru_cache(maxsize=4096)
+def _market_end(end_date: str) -> datetime:
+    """Parse a market end date once per distinct string; a date alone ends at 23:59:59 UTC."""
+    if 'T' not in end_date:
+        end_date_full = end_date.strip() + 'T23:59:59+00:00'
+    else:
+        # Si l'heure est à minuit, on remplace par 23:59:59
+        date_part, time_part = end_date.split('T')
+        if time_part.startswith('00:00:00'):
+            end_date_full = date_part + 'T23:59:59+00:00'
+        else:
+            end_date_full = end_date.replace("Z", "+00:00")
+    return datetime.fromisoformat(end_date_full)
+
+
+def _market_is_closed(market: dict, end_date) -> bool:
+    """Détermination dynamique de la fermeture du marché (même logique que détail)."""
+    if not end_date:
+        return bool(market.get("closed", False))
+    try:
+        end_dt = _market_end(end_date) if isinstance(end_date, str) else end_date
+        now = datetime.utcnow().replace(tzinfo=end_dt.tzinfo)
+        return now > end_dt
+    except Exception:
+        return bool(market.get("closed", False))
+
+
 def _create_market_card(market: dict, idx: int) -> str:
     """Generate HTML for a market card."""
     name = _display_name(market)
     # Truncate long names
     display_name = name[:60] + "..." if len(name) > 60 else name
-    
-    volume = format_number(market.get("volume_24h", 0))
-    liquidity = format_number(market.get("liquidity", 0))
-    
-    # Get YES price (synchronisé avec le détail)
+
+    # YES price from outcome_prices[0], colored by probability
     yes_price = "—"
     yes_color = COLORS["text_secondary"]
-    prices = market.get("outcome_prices", [])
-    slug = market.get("slug")
-    api = market.get("_api")  # Optionnel, si passé dans le dict
-    last_yes_price = None
-    # Si possible, récupérer le dernier prix traité du token YES via l'API
-    try:
-        if api and slug:
-            price_resp = api.get_price_history(slug, outcome_index=0)
-            if price_resp and price_resp.get("status") == 200:
-                price_data = price_resp.get("data") or {}
-                price_history = price_data.get("history", [])
-                if price_history:
-                    last_point = price_history[-1]
-                    p = last_point.get("price") or last_point.get("p")
-                    last_yes_price = float(p) * 100
-    except Exception:
-        last_yes_price = None
-    # Fallback sur outcome_prices[0] si pas d'historique
-    if last_yes_price is not None:
-        yes_val = last_yes_price
-    elif prices:
+    prices = market.get("outcome_prices")
+    if prices:
         try:
             yes_val = float(prices[0]) * 100
-        except:
+        except (TypeError, ValueError):
             yes_val = None
-    else:
-        yes_val = None
-    if yes_val is not None:
-        yes_price = f"{yes_val:.0f}%"
-        if yes_val >= 70:
-            yes_color = COLORS["accent_green"]
-        elif yes_val <= 30:
-            yes_color = COLORS["accent_red"]
-        else:
-            yes_color = COLORS["accent_blue"]
-    
-    # Status badge
-        # Détermination dynamique de la fermeture du marché (même logique que détail)
-        from datetime import datetime
-        end_date = market.get("end_date")
-        is_closed = False
-        if end_date:
-            try:
-                if isinstance(end_date, str):
-                    if 'T' not in end_date:
-                        end_date_full = end_date.strip() + 'T23:59:59+00:00'
-                    else:
-                        # Si l'heure est à minuit, on remplace par 23:59:59
-                        date_part, time_part = end_date.split('T')
-                        if time_part.startswith('00:00:00'):
-                            end_date_full = date_part + 'T23:59:59+00:00'
-                        else:
-                            end_date_full = end_date.replace("Z", "+00:00")
-                    end_dt = datetime.fromisoformat(end_date_full)
-                else:
-                    end_dt = end_date
-                now = datetime.utcnow().replace(tzinfo=end_dt.tzinfo)
-                if now > end_dt:
-                    is_closed = True
-            except Exception:
-                is_closed = market.get("closed", False)
-        else:
-            is_closed = market.get("closed", False)
-
-        # Get YES price
-        prices = market.get("outcome_prices", [])
-        yes_price = "—"
-        yes_color = COLORS["text_secondary"]
-        if prices:
-            try:
-                yes_val = float(prices[0]) * 100
-                yes_price = f"{yes_val:.0f}%"
-                # Color based on probability
-                if yes_val >= 70:
-                    yes_color = COLORS["accent_green"]
-                elif yes_val <= 30:
-                    yes_color = COLORS["accent_red"]
-                else:
-                    yes_color = COLORS["accent_blue"]
-            except:
-                pass
-        # Status badge
-        if is_closed:
-            badge = f'<span class="badge-closed">Closed</span>'
-        else:
-            time_left = time_until_end(end_date) if end_date else ""
-            if time_left:
-                badge = f'<span class="badge-active">{time_left}</span>'
+        if yes_val is not None:
+            yes_price = f"{yes_val:.0f}%"
+            if yes_val >= 70:
+                yes_color = COLORS["accent_green"]
+            elif yes_val <= 30:
+                yes_color = COLORS["accent_red"]
             else:
-                badge = '<span class="badge-active">Active</span>'
-    
-    return f"""
-    <div class="market-card" id="card-{idx}">
-        <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 12px;">
-            <span style="font-size: 28px; font-weight: bold; color: {yes_color};">{yes_price}</span>
-            {badge}
-        </div>
-        <div style="font-size: 14px; color: {COLORS['text_primary']}; margin-bottom: 12px; line-height: 1.4; min-height: 40px;">
-            {display_name}
-        </div>
-        <div style="display: flex; justify-content: space-between; color: {COLORS['text_secondary']}; font-size: 12px;">
-            <span>Vol: ${volume}</span>
-            <span>Liq: ${liquidity}</span>
-        </div>
-    </div>
-    """
+                yes_color = COLORS["accent_blue"]
+
+    # Status badge
+    end_date = market.get("end_date")
+    if _market_is_closed(market, end_date):
+        badge = _BADGE_CLOSED
+    else:
+        badge = _BADGE_ACTIVE.format(time_until_end(end_date) or "Active")
+
+    return _CARD_TEMPLATE.format_map({
+        "idx": idx,
+        "yes_color": yes_color,
+        "yes_price": yes_price,
+        "badge": badge,
+        "display_name": display_name,
+        "volume": format_number(market.get("volume_24h", 0)),
+        "liquidity": format_number(market.get("liquidity", 0)),
+    })
 
 
 
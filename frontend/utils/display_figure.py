@@ -1,9 +1,51 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
 from typing import List, Dict
 from utils.styles import COLORS
 from utils.helper import _parse_datetime
+from utils.downsample import lttb_indices
+
+
+# Price charts are 300px tall: more points than this only add payload
+PRICE_CHART_MAX_POINTS = 1000
+
+# Price chart layout is the same on every render, build it once
+_PRICE_CHART_LAYOUT = dict(
+    title=None,
+    paper_bgcolor=COLORS["bg_secondary"],
+    plot_bgcolor=COLORS["bg_secondary"],
+    height=300,
+    margin=dict(l=40, r=20, t=20, b=40),
+    xaxis=dict(
+        showgrid=True,
+        gridcolor=COLORS["border"],
+        tickfont=dict(color=COLORS["text_secondary"]),
+    ),
+    yaxis=dict(
+        showgrid=True,
+        gridcolor=COLORS["border"],
+        tickfont=dict(color=COLORS["text_secondary"]),
+        ticksuffix='%',
+        range=[0, 100]
+    ),
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1,
+        font=dict(color=COLORS["text_secondary"])
+    ),
+    hovermode='x unified'
+)
+
+_EMPTY_PRICE_CHART_LAYOUT = dict(
+    paper_bgcolor=COLORS["bg_secondary"],
+    plot_bgcolor=COLORS["bg_secondary"],
+    height=300
+)
 
 
 def _build_trades_dataframe(trades: List[Dict]) -> pd.DataFrame:
@@ -112,7 +154,7 @@ def _create_portfolio_pnl_chart(pnl_series: List[Dict]) -> go.Figure:
         if isinstance(ts, str):
             try:
                 ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-            except:
+            except ValueError:
                 continue
         timestamps.append(ts)
         pnl_values.append(point.get("total_pnl", 0))
@@ -227,7 +269,7 @@ def _create_position_pnl_chart(position: Dict) -> go.Figure:
         if isinstance(ts, str):
             try:
                 parsed_timestamps.append(datetime.fromisoformat(ts.replace("Z", "+00:00")))
-            except:
+            except ValueError:
                 continue
         else:
             parsed_timestamps.append(ts)
@@ -249,7 +291,7 @@ def _create_position_pnl_chart(position: Dict) -> go.Figure:
                 range_start = datetime.fromisoformat(first_trade_at.replace("Z", "+00:00"))
             else:
                 range_start = first_trade_at
-        except:
+        except ValueError:
             pass
     
     # Determine color based on final P&L
@@ -314,42 +356,40 @@ def _create_price_chart(price_history: list, market_name: str, is_no: bool = Fal
             x=0.5, y=0.5, showarrow=False,
             font=dict(size=14, color=COLORS["text_secondary"])
         )
-        fig.update_layout(
-            paper_bgcolor=COLORS["bg_secondary"],
-            plot_bgcolor=COLORS["bg_secondary"],
-            height=300
-        )
+        fig.update_layout(**_EMPTY_PRICE_CHART_LAYOUT)
         return fig
 
-    timestamps = []
-    prices = []
-    for point in price_history:
-        ts = point.get("timestamp") or point.get("t")
-        if ts:
-            try:
-                if isinstance(ts, str):
-                    dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                else:
-                    dt = datetime.fromtimestamp(ts)
-                timestamps.append(dt)
-            except:
-                continue
-        # Toujours utiliser 'price' (ou 'p'), car l'API retourne l'historique du token demandé
-        p = point.get("price") or point.get("p")
-        if p is not None:
-            try:
-                prices.append(float(p) * 100)
-            except:
-                prices.append(None)
+    # Parse whole columns at once; rows without a usable time or price are dropped
+    ts_raw = pd.Series([point.get("timestamp") or point.get("t") for point in price_history], dtype=object)
+    epoch = pd.to_numeric(ts_raw, errors="coerce")
+    timestamps = pd.to_datetime(epoch, unit="s", utc=True).fillna(
+        pd.to_datetime(ts_raw.where(epoch.isna()), utc=True, errors="coerce", format="ISO8601")
+    )
+    # Toujours utiliser 'price' (ou 'p'), car l'API retourne l'historique du token demandé
+    prices = pd.to_numeric(
+        pd.Series([point.get("price") or point.get("p") for point in price_history], dtype=object),
+        errors="coerce",
+    ) * 100
+    points = pd.DataFrame({"ts": timestamps, "price": prices}).dropna()
+
+    if len(points) > PRICE_CHART_MAX_POINTS:
+        # Keep the curve's shape with a bounded number of points
+        keep = lttb_indices(
+            points["ts"].to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9,
+            points["price"].to_numpy(),
+            PRICE_CHART_MAX_POINTS,
+        )
+        points = points.iloc[keep]
 
     fig = go.Figure()
-    if prices and timestamps:
+    if not points.empty:
         color = COLORS["accent_red"] if is_no else COLORS["accent_green"]
         fill_color = 'rgba(248, 81, 73, 0.1)' if is_no else 'rgba(63, 185, 80, 0.1)'
         token_name = 'NO' if is_no else 'YES'
-        fig.add_trace(go.Scatter(
-            x=timestamps[:len(prices)],
-            y=prices,
+        # WebGL trace: long histories draw in one GPU pass instead of SVG paths
+        fig.add_trace(go.Scattergl(
+            x=points["ts"].dt.tz_localize(None).to_numpy(),
+            y=points["price"].to_numpy(),
             mode='lines',
             name=token_name,
             line=dict(color=color, width=2),
@@ -357,32 +397,7 @@ def _create_price_chart(price_history: list, market_name: str, is_no: bool = Fal
             fillcolor=fill_color
         ))
 
-    fig.update_layout(
-        title=None,
-        paper_bgcolor=COLORS["bg_secondary"],
-        plot_bgcolor=COLORS["bg_secondary"],
-        height=300,
-        margin=dict(l=40, r=20, t=20, b=40),
-        xaxis=dict(
-            showgrid=True,
-            gridcolor=COLORS["border"],
-            tickfont=dict(color=COLORS["text_secondary"]),
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor=COLORS["border"],
-            tickfont=dict(color=COLORS["text_secondary"]),
-            ticksuffix='%',
-            range=[0, 100]
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(color=COLORS["text_secondary"])
-        ),
-        hovermode='x unified'
-    )
+    # Same uirevision across reruns keeps the user's zoom/pan; a new market
+    # or token gets a new revision and resets the view
+    fig.update_layout(**_PRICE_CHART_LAYOUT, uirevision=market_name)
     return fig
\ No newline at end of file
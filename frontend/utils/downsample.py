@@ -0,0 +1,48 @@
+"""
+Downsampling utilities for charts.
+
+Long series are reduced with Largest-Triangle-Three-Buckets (LTTB) before
+being sent to the browser, which keeps the visual shape of the curve with
+a fixed number of points.
+"""
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Select the indices of n_out points that best preserve the shape of (x, y).
+
+    The first and last points are always kept. The points in between are
+    split into n_out - 2 buckets and, in each, the point forming the largest
+    triangle with the previously kept point and the next bucket's average is
+    kept. x must be sorted and both arrays finite.
+
+    Returns:
+        Sorted index array; all indices when the series is already short
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
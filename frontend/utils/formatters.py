@@ -2,10 +2,11 @@
 Centralized formatting utilities for the trading UI.
 """
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Tuple
 
 
-def format_number(value: float, decimals: int = 2) -> str:
+def _format_number(value: float, decimals: int = 2) -> str:
     """Format numbers with K/M suffixes."""
     try:
         if value is None:
@@ -19,6 +20,19 @@ def format_number(value: float, decimals: int = 2) -> str:
         return "-"
 
 
+# Market lists format the same volumes and dates on every rerun. Pure
+# formatters are memoized; time_until_end depends on the clock and is not.
+_format_number_cached = lru_cache(maxsize=4096)(_format_number)
+
+
+def format_number(value: float, decimals: int = 2) -> str:
+    """Format numbers with K/M suffixes."""
+    try:
+        return _format_number_cached(value, decimals)
+    except TypeError:  # unhashable value, format it without the cache
+        return _format_number(value, decimals)
+
+
 def format_currency(value: float, decimals: int = 2) -> str:
     """Format as currency with $ prefix."""
     try:
@@ -39,7 +53,7 @@ def format_percent(value: float, decimals: int = 1) -> str:
         return "-"
 
 
-def format_date(date_str: str, fmt: str = "%d/%m/%Y") -> str:
+def _format_date(date_str: str, fmt: str = "%d/%m/%Y") -> str:
     """Format ISO date string for display."""
     try:
         if not date_str:
@@ -48,6 +62,17 @@ def format_date(date_str: str, fmt: str = "%d/%m/%Y") -> str:
         return dt.strftime(fmt)
     except Exception:
         return "-"
+
+
+_format_date_cached = lru_cache(maxsize=4096)(_format_date)
+
+
+def format_date(date_str: str, fmt: str = "%d/%m/%Y") -> str:
+    """Format ISO date string for display."""
+    try:
+        return _format_date_cached(date_str, fmt)
+    except TypeError:  # unhashable value, format it without the cache
+        return _format_date(date_str, fmt)
     
 def _format_datetime(dt: Optional[datetime]) -> str:
 	"""Format datetime into separate date and time strings."""
@@ -68,12 +93,18 @@ def format_datetime_parts(date_str: str) -> Tuple[str, str]:
         return "", ""
 
 
+@lru_cache(maxsize=4096)
+def _parse_iso(date_str: str) -> datetime:
+    """Parse an ISO date string; each distinct string is parsed only once."""
+    return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+
+
 def time_until_end(date_str: str) -> str:
     """Calculate time remaining until end date."""
     try:
         if not date_str:
             return ""
-        end_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        end_date = _parse_iso(date_str)
         now = datetime.now(end_date.tzinfo or None)
         
         if now >= end_date:
@@ -118,12 +149,15 @@ def _normalize_outcome(name: str) -> str:
     except Exception:
         return ""
     
+@lru_cache(maxsize=2048)
+def _slug_title(slug: str) -> str:
+    """Turn a market slug into a title, e.g. "will-it-rain" -> "Will It Rain"."""
+    return slug.replace("-", " ").replace("_", " ").title()
+
+
 def _display_name(market: dict) -> str:
     """Return a readable market name."""
-    name = market.get("question") or market.get("name") or market.get("title")
-    if name:
-        return name
-    slug = market.get("slug") or ""
-    if slug:
-        return slug.replace("-", " ").replace("_", " ").title()
-    return "Marché"
\ No newline at end of file
+    return (
+        market.get("question") or market.get("name") or market.get("title")
+        or _slug_title(market.get("slug") or "") or "Marché"
+    )
\ No newline at end of file
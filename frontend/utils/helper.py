@@ -1,21 +1,26 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Optional
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 
 from config import API_URL
-from utils.api import APIClient
+from utils.api import APIClient, get_api_client
 from utils.styles import COLORS
 
 def _init_state():
     """Initialize session state variables."""
-    if "trading_view" not in st.session_state:
-        st.session_state.trading_view = "list"
-    if "trading_page" not in st.session_state:
-        st.session_state.trading_page = 1
-    if "selected_market" not in st.session_state:
-        st.session_state.selected_market = None
+    defaults = {
+        "trading_view": "list",
+        "trading_page": 1,
+        "selected_market": None,
+    }
+    for key, value in defaults.items():
+        st.session_state.setdefault(key, value)
 
 def init_session():
     defaults = {
@@ -28,8 +33,7 @@ def init_session():
         "nav_override": None,
     }
     for key, value in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = value
+        st.session_state.setdefault(key, value)
             
 
 def _extract_market_name(market: dict) -> str:
@@ -54,21 +58,13 @@ def _resolve_market_name(api: APIClient, market_id: Optional[str], cache: dict)
 	if market_id in cache:
 		return cache[market_id]
 	
-	# Try slug endpoint first
-	resp = api.get_market(market_id)
+	# Slug or condition ID, resolved by the backend
+	resp = api.resolve_market(market_id)
 	if resp.get("status") == 200 and isinstance(resp.get("data"), dict):
 		market = resp["data"]
 		name = _extract_market_name(market)
 		cache[market_id] = name
 		return name
-	
-	# Fallback to condition endpoint
-	resp2 = api.get_market_by_condition(market_id)
-	if resp2.get("status") == 200 and isinstance(resp2.get("data"), dict):
-		market = resp2["data"]
-		name = _extract_market_name(market)
-		cache[market_id] = name
-		return name
 
 	# If unresolved, cache empty to avoid repeated calls
 	cache[market_id] = ""
@@ -159,3 +155,71 @@ def _get_pnl_color(value: float) -> str:
     elif value < 0:
         return COLORS["accent_red"]
     return COLORS["text_secondary"]
+
+
+def _parallel_get(calls: List[tuple], max_workers: int = 4) -> List:
+    """
+    Run independent API calls concurrently and return results in call order.
+    
+    Each call is a tuple `(func, *args)`. Worker threads are attached to the
+    current script run context so APIClient can read the session token.
+    """
+    if len(calls) <= 1:
+        return [func(*args) for func, *args in calls]
+    
+    ctx = get_script_run_ctx()
+    results = [None] * len(calls)
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+    ) as pool:
+        futures = {pool.submit(func, *args): i for i, (func, *args) in enumerate(calls)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+# Shared by background prefetches; nothing waits on them, two workers suffice
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+
+
+def _prefetch(func, *args, **kwargs) -> None:
+    """
+    Call a cached reader in the background so a later identical call hits the cache.
+    
+    The result is discarded: the call only warms func's st.cache_data entry,
+    so args and kwargs must match the later call exactly. The worker is
+    attached to the current script run context so APIClient can read the
+    session token.
+    """
+    ctx = get_script_run_ctx()
+    
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        func(*args, **kwargs)
+    
+    _PREFETCH_POOL.submit(run)
+
+
+# Cached readers of portfolio data, dropped together after any change to
+# portfolios or trades
+_PORTFOLIO_READERS = []
+
+
+def _portfolio_reader(reader):
+    """Register a st.cache_data reader for _clear_portfolio_cache."""
+    _PORTFOLIO_READERS.append(reader)
+    return reader
+
+
+def _clear_portfolio_cache() -> None:
+    """Drop cached portfolio reads, from whichever view made the change."""
+    for reader in _PORTFOLIO_READERS:
+        reader.clear()
+
+
+# Shared by the portfolio and trading views so a single clear() reaches both
+@_portfolio_reader
+@st.cache_data(ttl=10, show_spinner=False)
+def _list_portfolios(api_url, token):
+    return get_api_client(api_url).list_portfolios()
@@ -0,0 +1,81 @@
+"""
+Position aggregation utilities for the portfolio views.
+
+Trades are folded into net positions per (market, outcome) by a single
+helper, aggregate_positions, in one plain Python pass.
+"""
+from typing import Dict, List, Optional, Tuple
+
+
+PositionKey = Tuple[str, str]
+
+
+def price_by_outcome(market: Dict) -> Dict[str, Optional[float]]:
+    """
+    Map each normalized outcome name of a market to its current price.
+
+    The first occurrence of an outcome wins; unparsable prices map to None.
+    """
+    prices = market.get("outcome_prices") or []
+    mapping: Dict[str, Optional[float]] = {}
+    for outcome, price in zip(market.get("outcomes") or [], prices):
+        key = (outcome or "").strip().lower()
+        if key in mapping:
+            continue
+        try:
+            mapping[key] = float(price)
+        except (TypeError, ValueError):
+            mapping[key] = None
+    return mapping
+
+
+def _aggregate_loop(records: List[Dict]) -> Dict[PositionKey, Dict]:
+    """Fold trades, oldest first, into per-position totals."""
+    # sorted() calls the key once per trade, not per comparison; building a
+    # NumPy string array to argsort measured about twice as slow at any size
+    records = sorted(records, key=lambda t: t.get("created_at") or t.get("timestamp") or "")
+    # Each position is a [qty, notional, count, cost] list while folding
+    positions: Dict[PositionKey, list] = {}
+    for t in records:
+        get = t.get
+        key = (get("market_id") or "N/A", get("outcome") or "N/A")
+        pos = positions.get(key)
+        if pos is None:
+            pos = positions[key] = [0.0, 0.0, 0, 0.0]
+        qty = get("quantity") or 0
+        price = get("price") or 0
+        held = pos[0]
+        if (get("side") or "buy") == "buy":
+            pos[3] += qty * price
+        else:
+            if held > 0:
+                # Reduce cost at the average cost per unit before this sale
+                pos[3] = max(pos[3] - qty * (pos[3] / held), 0.0)
+            qty = -qty
+        pos[0] = held + qty
+        pos[1] += price * qty
+        pos[2] += 1
+    return {
+        key: {"qty": qty, "notional": notional, "count": count, "cost": cost}
+        for key, (qty, notional, count, cost) in positions.items()
+    }
+
+
+def aggregate_positions(trades: List[Dict], open_only: bool = False) -> Dict[PositionKey, Dict]:
+    """
+    Aggregate trades into net positions.
+
+    Trades are processed oldest first so the average cost basis is correct.
+    With open_only, positions with no quantity held are dropped before
+    anything is built from them.
+
+    Returns:
+        Dict keyed by (market_id, outcome) with qty, notional, count and cost
+    """
+    records = [t for t in trades or [] if isinstance(t, dict)]
+    if not records:
+        return {}
+    positions = _aggregate_loop(records)
+    if open_only:
+        return {key: pos for key, pos in positions.items() if pos["qty"] > 0}
+    return positions
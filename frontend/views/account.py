@@ -1,12 +1,12 @@
 import streamlit as st
-from utils.api import APIClient
+from utils.api import get_api_client
 from config import API_URL
 
 
 def render():
     st.title("My Account")
     
-    api = APIClient(API_URL)
+    api = get_api_client(API_URL)
     
     # --- Sections en onglets
     tab1, tab2 = st.tabs(["Profile", "Security"])
@@ -14,7 +14,7 @@ from datetime import datetime
 from typing import List, Dict, Optional
 
 from config import API_URL
-from utils.api import APIClient
+from utils.api import get_api_client
 
 from utils.helper import (_resolve_market_name,
 						  _extract_market_name,
@@ -29,7 +29,7 @@ def render():
 	"""Render the history page."""
 	st.title("Transaction History")
 	
-	api = APIClient(API_URL)
+	api = get_api_client(API_URL)
 	
 	# Fetch all trades
 	with st.spinner("Loading history..."):
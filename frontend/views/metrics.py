@@ -9,7 +9,7 @@ import plotly.graph_objects as go
 from datetime import datetime
 from typing import List, Dict, Optional
 
-from utils.api import APIClient
+from utils.api import get_api_client
 from utils.styles import COLORS
 from config import API_URL
 
@@ -59,7 +59,7 @@ def render():
     # Page title (same style as other pages)
     st.title("Metrics")
     
-    api = APIClient(API_URL)
+    api = get_api_client(API_URL)
     
     # =========================================================================
     # PORTFOLIO SELECTION
@@ -190,7 +190,7 @@ def render():
                 else:
                     span_str = f"{hours}h {(span.seconds % 3600) // 60}min"
                 st.caption(f"{len(pnl_series)} data points • Period: {span_str}")
-            except:
+            except (TypeError, ValueError, AttributeError):
                 st.caption(f"{len(pnl_series)} data points")
         else:
             st.caption(f"{len(pnl_series)} data points")
@@ -237,7 +237,7 @@ def render():
                     else:
                         first_trade_dt = first_trade_at
                     st.caption(f"Position opened on {first_trade_dt.strftime('%d/%m/%Y at %H:%M')}")
-                except:
+                except (TypeError, ValueError, AttributeError):
                     pass
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -1,25 +1,199 @@
 
 
+import pandas as pd
+import pyarrow as pa
 import streamlit as st
 from config import API_URL
-from utils.api import APIClient
-from utils.design_html import (
-    render_portfolio_card, 
-    render_position_card,
-    inject_portfolio_css,
-    inject_position_css
-)
+from utils.api import get_api_client
+from utils.design_html import render_portfolio_card, inject_portfolio_css
+from utils.formatters import format_currency
+from utils.helper import _clear_portfolio_cache, _list_portfolios, _parallel_get, _portfolio_reader
+from utils.positions import aggregate_positions, price_by_outcome
 
 
-def render():
-    st.title("Portfolios")
+# Reads are cached briefly so widget reruns do not refetch unchanged data.
+# The token is part of every key so cached responses are never shared
+# between users; mutations call _clear_portfolio_cache().
+
+@_portfolio_reader
+@st.cache_data(ttl=10, show_spinner=False)
+def _get_portfolio_summary(api_url, token, pid):
+    return get_api_client(api_url).get_portfolio_summary(pid)
+
+
+@_portfolio_reader
+@st.cache_data(ttl=10, show_spinner=False)
+def _get_open_positions(api_url, token, pid):
+    return get_api_client(api_url).get_positions(pid, open_only=True)
+
+
+@_portfolio_reader
+@st.cache_data(ttl=10, show_spinner=False)
+def _aggregate_trades(api_url, token, pid):
+    """
+    Aggregate open positions from the first page of trades, or None on failure.
+    
+    Fetch and fold are cached together so reruns skip both.
+    """
+    trades_resp = get_api_client(api_url).get_trades(pid, page=1, page_size=100)
+    if trades_resp.get("status") != 200:
+        return None
+    data_trades = trades_resp.get("data")
+    if isinstance(data_trades, dict):
+        trades = data_trades.get("trades") or []
+    elif isinstance(data_trades, list):
+        trades = data_trades
+    else:
+        trades = []
+    
+    # Trades are aggregated oldest first for correct cost basis calculation
+    return aggregate_positions(trades, open_only=True)
+
+
+# Market prices move faster than portfolios, so lookups expire sooner.
+# Shared across portfolios: a market held in several is fetched once.
+@st.cache_data(ttl=5, show_spinner=False)
+def _resolve_market(api_url, token, key):
+    return get_api_client(api_url).resolve_market(key)
+
+
+def _market_snapshot(market, market_resp):
+    """Return (question, normalized outcome -> price) from a resolve_market response."""
+    if isinstance(market_resp, dict) and market_resp.get("status") == 200:
+        mdata = market_resp.get("data", {})
+        # Get readable market question
+        return mdata.get("question") or market, price_by_outcome(mdata)
+    return market, {}
+
+
+def _resolve_sell_price(api, market, outcome, default):
+    """
+    Get the current price of an outcome with a single market lookup.
+    
+    The resolve endpoint already falls back from slug to condition ID, and
+    the outcome is matched with one dict lookup. Returns default when the
+    market or outcome price is unknown.
+    """
+    resp = _resolve_market(api.base_url, st.session_state.token, market)
+    _, outcome_prices = _market_snapshot(market, resp)
+    price = outcome_prices.get((outcome or "").strip().lower())
+    return default if price is None else price
+
+
+def _load_open_positions(api, pid):
+    """
+    Get open positions keyed by (market, outcome), or None on failure.
+    
+    Uses the server-side positions endpoint, falling back to aggregating
+    the first page of trades locally when the backend does not provide it.
+    """
+    token = st.session_state.token
+    positions_resp = _get_open_positions(api.base_url, token, pid)
+    if positions_resp.get("status") == 200:
+        return {
+            (pos.get("market_id") or "N/A", pos.get("outcome") or "N/A"): {
+                "qty": pos.get("quantity", 0),
+                "notional": pos.get("notional", 0),
+                "count": pos.get("trade_count", 0),
+                "cost": pos.get("cost_basis", 0),
+            }
+            for pos in positions_resp.get("data") or []
+        }
+    if positions_resp.get("status") != 404:
+        return None
+    
+    return _aggregate_trades(api.base_url, token, pid)
 
-    api = APIClient(API_URL)
 
-    if "selected_portfolio_id" not in st.session_state:
-        st.session_state.selected_portfolio_id = None
+def _build_summary(api, p):
+    """
+    Build a portfolio summary client-side from its aggregated positions.
+    
+    Fallback for backends without the summary endpoint. Returns the same
+    shape as `/portfolios/{id}/summary`, or None if positions cannot be loaded.
+    """
+    pid = p.get("_id") or p.get("id")
+    cash_balance = p.get("cash_balance") or p.get("initial_balance", 0)
+    initial_balance = p.get("initial_balance", 0)
+    
+    open_positions = _load_open_positions(api, pid)
+    if open_positions is None:
+        return None
+    
+    positions_data = []
+    total_exposure = 0.0
+    
+    # Resolve each market once, concurrently
+    markets = list(dict.fromkeys(market for market, _ in open_positions))
+    token = st.session_state.token
+    responses = _parallel_get(
+        [(_resolve_market, api.base_url, token, market) for market in markets],
+        max_workers=8,
+    )
+    market_cache = {
+        market: _market_snapshot(market, resp) for market, resp in zip(markets, responses)
+    }
+    
+    for (market, outcome), agg in open_positions.items():
+        qty = agg["qty"]
+        cost_basis = agg.get("cost", 0)
+        
+        # Get current market price and question, default to average entry price
+        current_price = agg["notional"] / qty
+        market_question, outcome_prices = market_cache[market]
+        price = outcome_prices.get((outcome or "").strip().lower())
+        if price is not None:
+            current_price = price
+        
+        current_value = qty * current_price
+        total_exposure += current_value
+        
+        # Performance
+        if cost_basis > 0:
+            performance = ((current_value - cost_basis) / cost_basis) * 100
+        else:
+            performance = 0
+        
+        positions_data.append({
+            "market": market,
+            "market_question": market_question,
+            "outcome": outcome,
+            "qty": qty,
+            "current_price": current_price,
+            "cost_basis": cost_basis,
+            "current_value": current_value,
+            "performance": performance,
+        })
+    
+    total_value = cash_balance + total_exposure
+    if initial_balance > 0:
+        performance = ((total_value - initial_balance) / initial_balance) * 100
+    else:
+        performance = 0
+    
+    return {
+        "portfolio_id": pid,
+        "name": p.get("name", "Sans nom"),
+        "initial_balance": initial_balance,
+        "cash_balance": cash_balance,
+        "total_exposure": total_exposure,
+        "total_value": total_value,
+        "performance": performance,
+        "positions": positions_data,
+    }
+
+
+def _load_summary(api, p):
+    """Get the portfolio summary from the backend, aggregating locally if unavailable."""
+    pid = p.get("_id") or p.get("id")
+    resp = _get_portfolio_summary(api.base_url, st.session_state.token, pid)
+    if resp.get("status") == 200 and isinstance(resp.get("data"), dict):
+        return resp["data"]
+    return _build_summary(api, p)
 
-    # Creation form
+
+def _render_create_form(api):
+    """Render the portfolio creation form."""
     with st.expander("Create a portfolio", expanded=True):
         with st.form("create_portfolio_form"):
             name = st.text_input("Portfolio name", placeholder="E.g.: Swing BTC")
@@ -35,17 +209,226 @@ def render():
                 else:
                     resp = api.create_portfolio(name, initial_balance)
                     if resp.get("status") == 201 or resp.get("status") == 200:
+                        _clear_portfolio_cache()
                         st.success("Portfolio created")
                         st.rerun()
                     else:
                         detail = resp.get("data", {}).get("detail") if isinstance(resp.get("data"), dict) else resp.get("error")
                         st.error(detail or "Unable to create portfolio")
 
+
+# Summary position fields shown in the table, and their column labels
+_POSITION_COLUMNS = {
+    "market_question": "Market",
+    "outcome": "Outcome",
+    "qty": "Quantity",
+    "current_price": "Price",
+    "cost_basis": "Cost basis",
+    "current_value": "Value",
+    "performance": "Performance",
+}
+# Rounded once for the whole table rather than per value
+_POSITION_DECIMALS = {
+    "Quantity": 4,
+    "Price": 4,
+    "Cost basis": 2,
+    "Value": 2,
+    "Performance": 1,
+}
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _positions_table(positions):
+    """
+    Build the positions table as an Arrow table.
+    
+    st.dataframe takes Arrow as is, so cached reruns skip both the
+    DataFrame build and the pandas to Arrow conversion.
+    """
+    df = (
+        pd.DataFrame.from_records(positions, columns=list(_POSITION_COLUMNS))
+        .rename(columns=_POSITION_COLUMNS)
+        .round(_POSITION_DECIMALS)
+    )
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _render_positions(api, pid, positions):
+    """
+    Render open positions as one table with Edit and Liquidate actions.
+    
+    Actions apply to the selected row, so the page sends a single table
+    instead of a card and two buttons per position.
+    """
+    event = st.dataframe(
+        _positions_table(positions),
+        key=f"positions_{pid}",
+        on_select="rerun",
+        selection_mode="single-row",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Market": st.column_config.TextColumn(width="large"),
+            "Outcome": st.column_config.TextColumn(width="small"),
+            "Quantity": st.column_config.NumberColumn(format="%.2f"),
+            "Price": st.column_config.NumberColumn(format="$%.4f"),
+            "Cost basis": st.column_config.NumberColumn(format="$%.2f"),
+            "Value": st.column_config.NumberColumn(format="$%.2f"),
+            "Performance": st.column_config.NumberColumn(format="%.1f%%"),
+        },
+    )
+    rows = event.selection.rows
+    # A selection kept from before a rerun can point past a shrunk table
+    pos = positions[rows[0]] if rows and rows[0] < len(positions) else None
+    
+    # Buttons row, acting on the selected position
+    btn_col1, btn_col2, btn_spacer = st.columns([1, 1, 4])
+    with btn_col1:
+        if st.button("Edit", key=f"modify_{pid}", disabled=pos is None, use_container_width=True):
+            st.session_state["nav_page"] = "Trading"
+            st.session_state["nav_override"] = "Trading"
+            st.session_state["selected_market"] = pos["market"]
+            st.session_state["trading_view"] = "detail"
+            st.session_state["prefill_action"] = "SELL"
+            st.session_state["prefill_outcome"] = pos["outcome"]
+            st.session_state["prefill_max_qty"] = float(pos["qty"])
+            st.session_state["prefill_portfolio_id"] = pid
+            st.rerun()
+    with btn_col2:
+        if st.button("Liquidate", key=f"liquidate_{pid}", disabled=pos is None, use_container_width=True):
+            with st.spinner("Liquidating..."):
+                sell_price = _resolve_sell_price(api, pos["market"], pos["outcome"], pos["current_price"])
+                resp_trade = api.create_trade(
+                    portfolio_id=pid,
+                    market_id=pos["market"],
+                    outcome=pos["outcome"],
+                    side="sell",
+                    quantity=float(pos["qty"]),
+                    price=float(sell_price),
+                    notes="Automatic liquidation",
+                )
+                if resp_trade.get("status") in (200, 201):
+                    _clear_portfolio_cache()
+                    st.success("Position successfully liquidated")
+                    st.rerun()
+                else:
+                    detail = resp_trade.get("data", {}).get("detail") if isinstance(resp_trade.get("data"), dict) else resp_trade.get("error")
+                    st.error(detail or "Liquidation failed")
+    if pos is None:
+        st.caption("Select a position to edit or liquidate it.")
+
+
+def _toggle_portfolio(pid):
+    """Open or close the inline detail of a portfolio card."""
+    open_portfolios = st.session_state.open_portfolios
+    if pid in open_portfolios:
+        open_portfolios.discard(pid)
+    else:
+        open_portfolios.add(pid)
+
+
+@st.fragment
+def _render_portfolio(p, api):
+    """
+    Render one portfolio card with its actions and inline detail.
+    
+    Runs as a fragment so that toggling the detail view reruns only this
+    card instead of refetching every portfolio.
+    """
+    name = p.get("name", "Sans nom")
+    pid = p.get("_id") or p.get("id")
+    summary = _load_summary(api, p)
+    
+    if summary is not None:
+        cash_balance = summary["cash_balance"]
+        initial_balance = summary["initial_balance"]
+        total_exposure = summary["total_exposure"]
+        total_value = summary["total_value"]
+        performance = summary["performance"]
+    else:
+        # Trades unavailable: show cash only
+        cash_balance = p.get("cash_balance") or p.get("initial_balance", 0)
+        initial_balance = p.get("initial_balance", 0)
+        total_exposure = 0.0
+        total_value = cash_balance
+        if initial_balance > 0:
+            performance = ((total_value - initial_balance) / initial_balance) * 100
+        else:
+            performance = 0
+    
+    perf_class = "positive" if performance > 0 else ("negative" if performance < 0 else "neutral")
+    perf_sign = "+" if performance > 0 else ""
+    
+    # Render portfolio card
+    render_portfolio_card(name, pid, performance, perf_class, perf_sign, total_value, cash_balance, total_exposure, initial_balance)
+    
+    # Each card keeps its own open state, so toggling never touches the others
+    open_portfolios = st.session_state.open_portfolios
+    is_open = pid in open_portfolios
+    
+    # Action buttons
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+    with col1:
+        # The callback runs before the fragment rerun the click triggers,
+        # so the card redraws in its new state without a second rerun
+        st.button(
+            "Hide" if is_open else "Details",
+            key=f"view_{pid}",
+            on_click=_toggle_portfolio,
+            args=(pid,),
+            use_container_width=True,
+        )
+    with col2:
+        if st.button("Metrics", key=f"metrics_{pid}", use_container_width=True):
+            st.session_state["metrics_portfolio_id"] = pid
+            st.session_state["nav_override"] = "Metrics"
+            st.rerun()
+    with col3:
+        if st.button("Trade", key=f"trade_{pid}", use_container_width=True):
+            st.session_state["nav_override"] = "Trading"
+            st.rerun()
+    with col4:
+        if st.button("Delete", key=f"delete_{pid}", use_container_width=True):
+            del_resp = api.delete_portfolio(pid)
+            if del_resp.get("status") in (200, 204):
+                _clear_portfolio_cache()
+                st.success("Portfolio deleted")
+                open_portfolios.discard(pid)
+                st.rerun()
+            else:
+                detail = del_resp.get("data", {}).get("detail") if isinstance(del_resp.get("data"), dict) else del_resp.get("error")
+                st.error(detail or "Unable to delete portfolio")
+
+    # Inline detail if open
+    if is_open:
+        st.caption(f"Initial amount: {format_currency(initial_balance)}")
+        
+        if summary is None:
+            st.error("Unable to retrieve trades")
+        elif summary["positions"]:
+            st.subheader("Portfolio composition")
+            _render_positions(api, pid, summary["positions"])
+        else:
+            st.info("No positions yet.")
+
+    st.divider()
+
+
+def render():
+    st.title("Portfolios")
+
+    api = get_api_client(API_URL)
+
+    if "open_portfolios" not in st.session_state:
+        st.session_state.open_portfolios = set()
+
+    _render_create_form(api)
+
     st.divider()
 
     # List portfolios
     st.subheader("Your portfolios")
-    resp = api.list_portfolios()
+    resp = _list_portfolios(API_URL, st.session_state.token)
     if resp.get("status") == 200:
         portfolios = resp.get("data") or []
         if isinstance(portfolios, dict):
@@ -54,309 +437,15 @@ def render():
             # CSS for portfolio cards
             inject_portfolio_css()
             
+            # Warm the summary cache for all cards concurrently
+            token = st.session_state.token
+            _parallel_get([
+                (_get_portfolio_summary, API_URL, token, p.get("_id") or p.get("id"))
+                for p in portfolios
+            ])
+            
             for p in portfolios:
-                name = p.get("name", "Sans nom")
-                cash_balance = p.get("cash_balance") or p.get("initial_balance", 0)
-                initial_balance = p.get("initial_balance", 0)
-                pid = p.get("_id") or p.get("id")
-                
-                # Calculate total portfolio value (cash + positions)
-                total_exposure = 0.0
-                positions_count = 0
-                
-                # Get trades to calculate positions value
-                trades_resp = api.get_trades(pid, page=1, page_size=100)
-                if trades_resp.get("status") == 200:
-                    data_trades = trades_resp.get("data")
-                    if isinstance(data_trades, dict):
-                        trades = data_trades.get("trades") or []
-                    elif isinstance(data_trades, list):
-                        trades = data_trades
-                    else:
-                        trades = []
-                    
-                    if trades:
-                        trades = sorted(trades, key=lambda t: t.get("created_at") or t.get("timestamp") or "")
-                        positions = {}
-                        for t in trades:
-                            if not isinstance(t, dict):
-                                continue
-                            market = t.get("market_id") or "N/A"
-                            outcome = t.get("outcome") or "N/A"
-                            side = t.get("side") or "buy"
-                            qty = t.get("quantity", 0) or 0
-                            price = t.get("price", 0) or 0
-                            key = (market, outcome)
-                            if key not in positions:
-                                positions[key] = {"qty": 0.0, "notional": 0.0}
-                            delta = qty if side == "buy" else -qty
-                            positions[key]["qty"] += delta
-                            positions[key]["notional"] += price * qty * (1 if side == "buy" else -1)
-                        
-                        for (market, outcome), agg in positions.items():
-                            qty = agg["qty"]
-                            if qty <= 0:
-                                continue
-                            positions_count += 1
-                            avg_price = agg["notional"] / qty if qty else 0
-                            current_price = avg_price
-                            
-                            # Try to get current price
-                            market_resp = api.get_market(market)
-                            if not (isinstance(market_resp, dict) and market_resp.get("status") == 200):
-                                market_resp = api.get_market_by_condition(market)
-                            if isinstance(market_resp, dict) and market_resp.get("status") == 200:
-                                mdata = market_resp.get("data", {})
-                                outcomes_list = mdata.get("outcomes") or []
-                                prices = mdata.get("outcome_prices") or []
-                                norm_out = (outcome or "").strip().lower()
-                                for i, o in enumerate(outcomes_list):
-                                    if (o or "").strip().lower() == norm_out and i < len(prices):
-                                        try:
-                                            current_price = float(prices[i])
-                                        except:
-                                            pass
-                                        break
-                            
-                            total_exposure += qty * current_price
-                
-                # Calculate total value and performance
-                total_value = cash_balance + total_exposure
-                if initial_balance > 0:
-                    performance = ((total_value - initial_balance) / initial_balance) * 100
-                else:
-                    performance = 0
-                
-                perf_class = "positive" if performance > 0 else ("negative" if performance < 0 else "neutral")
-                perf_sign = "+" if performance > 0 else ""
-                
-                # Render portfolio card
-                render_portfolio_card(name, pid, performance, perf_class, perf_sign, total_value, cash_balance, total_exposure, initial_balance)
-                
-                # Action buttons
-                col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
-                with col1:
-                    if st.button(
-                        "Details" if st.session_state.selected_portfolio_id != pid else "Hide",
-                        key=f"view_{pid}",
-                        use_container_width=True,
-                    ):
-                        if st.session_state.selected_portfolio_id == pid:
-                            st.session_state.selected_portfolio_id = None
-                        else:
-                            st.session_state.selected_portfolio_id = pid
-                        st.rerun()
-                with col2:
-                    if st.button("Metrics", key=f"metrics_{pid}", use_container_width=True):
-                        st.session_state["metrics_portfolio_id"] = pid
-                        st.session_state["nav_override"] = "Metrics"
-                        st.rerun()
-                with col3:
-                    if st.button("Trade", key=f"trade_{pid}", use_container_width=True):
-                        st.session_state["nav_override"] = "Trading"
-                        st.rerun()
-                with col4:
-                    if st.button("Delete", key=f"delete_{pid}", use_container_width=True):
-                        del_resp = api.delete_portfolio(pid)
-                        if del_resp.get("status") in (200, 204):
-                            st.success("Portfolio deleted")
-                            if st.session_state.selected_portfolio_id == pid:
-                                st.session_state.selected_portfolio_id = None
-                            st.rerun()
-                        else:
-                            detail = del_resp.get("data", {}).get("detail") if isinstance(del_resp.get("data"), dict) else del_resp.get("error")
-                            st.error(detail or "Unable to delete portfolio")
-
-                # Inline detail if selected
-                if st.session_state.selected_portfolio_id == pid:
-                    detail_resp = api.get_portfolio(pid)
-                    if detail_resp.get("status") == 200:
-                        p_detail = detail_resp.get("data", {})
-                        init_bal = p_detail.get("initial_balance", 0)
-                        st.caption(f"Initial amount: ${init_bal:,.2f}")
-                    else:
-                        detail = detail_resp.get("data", {}).get("detail") if isinstance(detail_resp.get("data"), dict) else detail_resp.get("error")
-                        st.error(detail or "Unable to load portfolio")
-                        st.divider()
-                        continue
-
-                    trades_resp = api.get_trades(pid, page=1, page_size=100)
-                    if trades_resp.get("status") == 200:
-                        data_trades = trades_resp.get("data")
-                        if isinstance(data_trades, dict):
-                            trades = data_trades.get("trades") or []
-                        elif isinstance(data_trades, list):
-                            trades = data_trades
-                        else:
-                            trades = []
-
-                        if trades:
-                            # Sort trades by date (oldest first) for correct cost basis calculation
-                            trades = sorted(trades, key=lambda t: t.get("created_at") or t.get("timestamp") or "")
-                            
-                            positions = {}
-                            for t in trades:
-                                if not isinstance(t, dict):
-                                    continue
-                                market = t.get("market_id") or "N/A"
-                                outcome = t.get("outcome") or "N/A"
-                                side = t.get("side") or "buy"
-                                qty = t.get("quantity", 0) or 0
-                                price = t.get("price", 0) or 0
-                                key = (market, outcome)
-                                if key not in positions:
-                                    positions[key] = {"qty": 0.0, "notional": 0.0, "count": 0, "cost": 0.0}
-                                
-                                # Track cost basis BEFORE updating quantity
-                                if side == "buy":
-                                    positions[key]["cost"] += qty * price
-                                else:
-                                    # Reduce cost proportionally when selling
-                                    # Calculate average cost per unit before this sale
-                                    current_qty = positions[key]["qty"]
-                                    current_cost = positions[key]["cost"]
-                                    if current_qty > 0:
-                                        avg_cost_per_unit = current_cost / current_qty
-                                        positions[key]["cost"] -= qty * avg_cost_per_unit
-                                        # Ensure cost doesn't go negative
-                                        if positions[key]["cost"] < 0:
-                                            positions[key]["cost"] = 0
-                                
-                                # Now update quantity
-                                delta = qty if side == "buy" else -qty
-                                positions[key]["qty"] += delta
-                                positions[key]["notional"] += price * qty * (1 if side == "buy" else -1)
-                                positions[key]["count"] += 1
-
-                            st.subheader("Portfolio composition")
-                            
-                            # Prepare positions data with current prices
-                            positions_data = []
-                            total_exposure = 0.0
-                            total_cost = 0.0
-                            
-                            for (market, outcome), agg in positions.items():
-                                qty = agg["qty"]
-                                if qty == 0:
-                                    continue
-                                    
-                                avg_price = 0 if qty == 0 else agg["notional"] / (agg["qty"] if agg["qty"] else 1)
-                                cost_basis = agg.get("cost", 0)
-                                
-                                # Get current market price and question
-                                current_price = avg_price
-                                market_question = market  # Default to slug
-                                market_resp = api.get_market(market)
-                                if not (isinstance(market_resp, dict) and market_resp.get("status") == 200):
-                                    market_resp = api.get_market_by_condition(market)
-                                if isinstance(market_resp, dict) and market_resp.get("status") == 200:
-                                    mdata = market_resp.get("data", {})
-                                    # Get readable market question
-                                    market_question = mdata.get("question") or market
-                                    outcomes_list = mdata.get("outcomes") or []
-                                    prices = mdata.get("outcome_prices") or []
-                                    norm_out = (outcome or "").strip().lower()
-                                    for i, o in enumerate(outcomes_list):
-                                        if (o or "").strip().lower() == norm_out and i < len(prices):
-                                            try:
-                                                current_price = float(prices[i])
-                                            except Exception:
-                                                pass
-                                            break
-                                
-                                current_value = qty * current_price
-                                total_exposure += current_value
-                                total_cost += cost_basis
-                                
-                                # Performance
-                                if cost_basis > 0:
-                                    performance = ((current_value - cost_basis) / cost_basis) * 100
-                                else:
-                                    performance = 0
-                                
-                                positions_data.append({
-                                    "market": market,
-                                    "market_question": market_question,
-                                    "outcome": outcome,
-                                    "qty": qty,
-                                    "current_price": current_price,
-                                    "cost_basis": cost_basis,
-                                    "current_value": current_value,
-                                    "performance": performance,
-                                })
-                            
-                            if positions_data:
-                                # CSS for position cards
-                                inject_position_css()
-                                
-                                for pos in positions_data:
-                                    perf_class = "perf-positive" if pos["performance"] >= 0 else "perf-negative"
-                                    perf_sign = "+" if pos["performance"] >= 0 else ""
-                                    # Truncate market question if too long
-                                    market_display = pos.get("market_question", pos["market"])
-                                    if len(market_display) > 60:
-                                        market_display = market_display[:57] + "..."
-                                    
-                                    render_position_card(pos, pid)
-                                    
-                                    # Buttons row
-                                    btn_col1, btn_col2, btn_spacer = st.columns([1, 1, 4])
-                                    with btn_col1:
-                                        if st.button("Edit", key=f"modify_{pid}_{pos['market']}_{pos['outcome']}", use_container_width=True):
-                                            st.session_state["nav_page"] = "Trading"
-                                            st.session_state["nav_override"] = "Trading"
-                                            st.session_state["selected_market"] = pos["market"]
-                                            st.session_state["trading_view"] = "detail"
-                                            st.session_state["prefill_action"] = "SELL"
-                                            st.session_state["prefill_outcome"] = pos["outcome"]
-                                            st.session_state["prefill_max_qty"] = float(pos["qty"])
-                                            st.session_state["prefill_portfolio_id"] = pid
-                                            st.rerun()
-                                    with btn_col2:
-                                        if st.button("Liquidate", key=f"liquidate_{pid}_{pos['market']}_{pos['outcome']}", use_container_width=True):
-                                            with st.spinner("Liquidating..."):
-                                                sell_price = pos["current_price"]
-                                                resp_trade = api.create_trade(
-                                                    portfolio_id=pid,
-                                                    market_id=pos["market"],
-                                                    outcome=pos["outcome"],
-                                                    side="sell",
-                                                    quantity=float(pos["qty"]),
-                                                    price=float(sell_price),
-                                                    notes="Automatic liquidation",
-                                                )
-                                                if resp_trade.get("status") in (200, 201):
-                                                    st.success("Position successfully liquidated")
-                                                    st.rerun()
-                                                else:
-                                                    detail = resp_trade.get("data", {}).get("detail") if isinstance(resp_trade.get("data"), dict) else resp_trade.get("error")
-                                                    st.error(detail or "Liquidation failed")
-                                    
-                                    st.markdown("<div style='height: 10px'></div>", unsafe_allow_html=True)
-                                
-                                # Calculate global performance based on initial balance vs current total value
-                                cash_balance = p_detail.get("cash_balance", 0) or 0
-                                total_value = cash_balance + total_exposure
-                                
-                                if init_bal > 0:
-                                    global_perf = ((total_value - init_bal) / init_bal) * 100
-                                    perf_sign = "+" if global_perf >= 0 else ""
-                                    perf_class = "perf-positive-bg" if global_perf >= 0 else "perf-negative-bg"
-                                else:
-                                    global_perf = 0
-                                    perf_sign = ""
-                                    perf_class = ""
-                                
-                                # (Suppression de l'affichage de la valeur totale et de la performance globale)
-                            else:
-                                st.info("No positions yet.")
-                        else:
-                            st.info("No trades for this portfolio.")
-                    else:
-                        detail = trades_resp.get("data", {}).get("detail") if isinstance(trades_resp.get("data"), dict) else trades_resp.get("error")
-                        st.error(detail or "Unable to retrieve trades")
-
-                st.divider()
+                _render_portfolio(p, api)
         else:
             st.info("No portfolios yet. Create one above.")
     else:
@@ -1,12 +1,13 @@
 """
 Trading View - Professional card-based market explorer with Plotly charts
 """
+import html
 import streamlit as st
 import plotly.graph_objects as go
-from datetime import datetime
+from collections import defaultdict
 import pandas as pd
 from config import API_URL
-from utils.api import APIClient
+from utils.api import APIClient, get_api_client
 from utils.styles import COLORS
 from utils.formatters import (
     format_number,
@@ -18,15 +19,39 @@ from utils.formatters import (
     _display_name
 )
 
-import time
-
-
-from utils.helper import _init_state
+from utils.helper import _clear_portfolio_cache, _init_state, _list_portfolios, _parallel_get, _prefetch
+from utils.positions import price_by_outcome
 from utils.design_html import (_create_market_card,
+                               _market_is_closed,
                                display_orderbook_ui)
 from utils.display_figure import _create_price_chart 
 
 
+# Reads are cached so widget reruns do not refetch unchanged data. Market
+# metadata changes slowly, price history quickly. The token is part of
+# every key so cached responses are never shared between users.
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_markets(api_url, token, page, page_size, search, active, closed, volume_min, sort_by):
+    return get_api_client(api_url).list_markets(
+        page=page,
+        page_size=page_size,
+        search=search,
+        active=active,
+        closed=closed,
+        volume_min=volume_min,
+        sort_by=sort_by,
+    )
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _resolve_market(api_url, token, key):
+    return get_api_client(api_url).resolve_market(key)
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _get_price_history(api_url, token, slug, outcome_index):
+    return get_api_client(api_url).get_price_history(slug, outcome_index=outcome_index)
 
 
 def _create_orderbook_depth_chart(orderbook: dict, market: dict):
@@ -140,10 +165,8 @@ def _create_orderbook_depth_chart(orderbook: dict, market: dict):
             st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
 
 
-def _render_position_panel(api: APIClient, market: dict):
+def _render_position_panel(api: APIClient, market: dict, portfolios_resp: dict):
     """Render position panel for the current market if user has a position."""
-    # Get all user portfolios
-    portfolios_resp = api.list_portfolios()
     if portfolios_resp.get("status") != 200:
         return
     
@@ -153,76 +176,52 @@ def _render_position_panel(api: APIClient, market: dict):
     
     market_slug = market.get("slug")
     outcomes = market.get("outcomes", [])
-    outcome_prices = market.get("outcome_prices", [])
-    # st.write(outcomes)
-    # Build price map
-    price_map = {}
-    for outcome, price_str in zip(outcomes, outcome_prices):
-        try:
-            price_map[outcome] = float(price_str)
-        except:
-            price_map[outcome] = 0.5
+    # Current price per normalized outcome, None when missing or unparsable
+    price_map = price_by_outcome(market)
     
     # Market identifiers
-    market_keys = [
-        market_slug,
-        market.get("condition_id"),
-        market.get("_id"),
-        market.get("id"),
-    ]
-    market_keys = [str(k) for k in market_keys if k]
+    market_keys = frozenset(
+        str(k) for k in (market_slug, market.get("condition_id"), market.get("_id"), market.get("id")) if k
+    )
     
     # Aggregate positions across all portfolios
     all_positions = []  # List of {portfolio_name, outcome, qty, cost_basis, ...}
     
-    for portfolio in portfolios:
-        portfolio_id = portfolio.get("_id") or portfolio.get("id")
+    # Fetch every portfolio's positions on this market concurrently. Closed
+    # ones are kept: a position is netted across the market's identifiers
+    # first and dropped below only if the summed quantity is zero
+    portfolios = [p for p in portfolios if p.get("_id") or p.get("id")]
+    market_ids = sorted(market_keys)
+    positions_resps = _parallel_get(
+        [(api.get_positions, str(p.get("_id") or p.get("id")), False, market_ids) for p in portfolios],
+        max_workers=8,
+    )
+    
+    for portfolio, positions_resp in zip(portfolios, positions_resps):
         portfolio_name = portfolio.get("name", "Sans nom")
-        if not portfolio_id:
+        if positions_resp.get("status") != 200:
             continue
         
-        trades_resp = api.get_trades(str(portfolio_id), page=1, page_size=100)
-        if trades_resp.get("status") != 200:
-            continue
-        
-        trades_data = trades_resp.get("data", {})
-        trades = trades_data.get("trades", []) if isinstance(trades_data, dict) else trades_data
-        trades = sorted(trades, key=lambda t: t.get("created_at", ""))
-        
-        # Calculate position per outcome
+        # Positions on this market under any of its identifiers, per outcome
         position_metrics = {}
-        for trade in trades:
-            trade_market = str(trade.get("market_id", ""))
-            if trade_market not in market_keys:
+        for pos in positions_resp.get("data") or []:
+            if str(pos.get("market_id", "")) not in market_keys:
                 continue
-            
-            outcome_key = _normalize_outcome(trade.get("outcome"))
-            if outcome_key not in position_metrics:
-                position_metrics[outcome_key] = {"qty": 0, "cost_basis": 0}
-            
-            qty = float(trade.get("quantity", 0))
-            price = float(trade.get("price", 0))
-            side = trade.get("side", "").lower()
-            
-            if side == "buy":
-                position_metrics[outcome_key]["qty"] += qty
-                position_metrics[outcome_key]["cost_basis"] += qty * price
-            elif side == "sell":
-                current_qty = position_metrics[outcome_key]["qty"]
-                current_cost = position_metrics[outcome_key]["cost_basis"]
-                if current_qty > 0:
-                    avg_cost = current_cost / current_qty
-                    position_metrics[outcome_key]["cost_basis"] -= qty * avg_cost
-                position_metrics[outcome_key]["qty"] -= qty
+            metrics = position_metrics.setdefault(
+                _normalize_outcome(pos.get("outcome")), {"qty": 0.0, "cost": 0.0}
+            )
+            metrics["qty"] += pos.get("quantity", 0)
+            metrics["cost"] += pos.get("cost_basis", 0)
         
         # Add non-zero positions
         for out in outcomes:
-            norm_out = _normalize_outcome(out)
-            metrics = position_metrics.get(norm_out, {"qty": 0, "cost_basis": 0})
-            qty = metrics["qty"]
-            if qty > 0:
-                cost_basis = metrics["cost_basis"]
-                current_price = price_map.get(out, 0.5)
+            metrics = position_metrics.get(_normalize_outcome(out))
+            if metrics and metrics["qty"] > 0:
+                qty = metrics["qty"]
+                cost_basis = metrics["cost"]
+                current_price = price_map.get(_normalize_outcome(out))
+                if current_price is None:
+                    current_price = 0.5
                 current_value = qty * current_price
                 pnl_dollar = current_value - cost_basis
                 pnl_percent = ((current_value - cost_basis) / cost_basis * 100) if cost_basis > 0 else 0
@@ -243,16 +242,19 @@ def _render_position_panel(api: APIClient, market: dict):
     
     st.markdown("### Your positions on this market")
     
+    # One markdown call for every card: a single delta instead of one per position
+    html_parts = []
     for pos in all_positions:
-        pnl_sign = "+" if pos["pnl_dollar"] >= 0 else ""
-        pnl_color = "#22c55e" if pos["pnl_dollar"] >= 0 else "#ef4444"
+        pnl_dollar = pos["pnl_dollar"]
+        pnl_sign = "+" if pnl_dollar >= 0 else ""
+        pnl_color = "#22c55e" if pnl_dollar >= 0 else "#ef4444"
         
-        st.markdown(
+        html_parts.append(
             f"""
             <div style="background: linear-gradient(135deg, #1e1e2e, #2d2d44); border-radius: 10px; padding: 15px; margin-bottom: 10px; border-left: 4px solid #6366f1;">
                 <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
-                    <span style="font-weight: 600; color: #a0a0a0; font-size: 12px;">{pos["portfolio"]}</span>
-                    <span style="font-weight: 700; color: #6366f1; font-size: 16px;">{pos["outcome"]}</span>
+                    <span style="font-weight: 600; color: #a0a0a0; font-size: 12px;">{html.escape(str(pos["portfolio"]))}</span>
+                    <span style="font-weight: 700; color: #6366f1; font-size: 16px;">{html.escape(str(pos["outcome"]))}</span>
                 </div>
                 <div style="display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 15px;">
                     <div style="text-align: center;">
@@ -273,54 +275,77 @@ def _render_position_panel(api: APIClient, market: dict):
                     </div>
                     <div style="text-align: center;">
                         <div style="color: #a0a0a0; font-size: 10px; text-transform: uppercase;">P&L</div>
-                        <div style="color: {pnl_color}; font-weight: 700;">{pnl_sign}${pos["pnl_dollar"]:.2f} ({pnl_sign}{pos["pnl_percent"]:.1f}%)</div>
+                        <div style="color: {pnl_color}; font-weight: 700;">{pnl_sign}${pnl_dollar:.2f} ({pnl_sign}{pos["pnl_percent"]:.1f}%)</div>
                     </div>
                 </div>
             </div>
-            """,
-            unsafe_allow_html=True
+            """.strip()
         )
+    st.markdown("".join(html_parts), unsafe_allow_html=True)
+
+
+def _open_market_from_grid():
+    """Open the market picked below the card grid and reset the picker."""
+    slug = st.session_state.get("market_grid_choice")
+    if slug:
+        st.session_state.selected_market = slug
+        st.session_state.trading_view = "detail"
+    st.session_state.market_grid_choice = None
+
+
+def _turn_market_page(step: int):
+    """Move the market list by step pages before the rerun renders it."""
+    st.session_state.trading_page += step
 
 
 def _render_market_list(api: APIClient):
     """Render the market explorer with card grid."""
     st.markdown("## Explore markets")
     
-    # Search and filters in a clean row
-    col_search, col_status, col_sort, col_vol = st.columns([2, 1, 1, 1])
-    
-    with col_search:
-        search = st.text_input(
-            "Search",
-            placeholder="Market name...",
-            label_visibility="collapsed"
-        )
-    
-    with col_status:
-        status_filter = st.selectbox(
-            "Status",
-            ["All", "Active", "Closed"],
-            index=1,  # Default to active markets
-            label_visibility="collapsed"
-        )
-    
-    with col_sort:
-        sort_by = st.selectbox(
-            "Sort",
-            ["volume_24h", "liquidity"],
-            format_func=lambda x: "24h Volume" if x == "volume_24h" else "Liquidity",
-            label_visibility="collapsed"
-        )
+    # Search and filters in a clean row. They sit in a form so the markets
+    # are fetched once per search, not once per edited filter.
+    with st.form("market_filters", clear_on_submit=False, border=False):
+        col_search, col_status, col_sort, col_vol, col_submit = st.columns([2, 1, 1, 1, 1])
+        
+        with col_search:
+            search = st.text_input(
+                "Search",
+                placeholder="Market name...",
+                label_visibility="collapsed"
+            )
+        
+        with col_status:
+            status_filter = st.selectbox(
+                "Status",
+                ["All", "Active", "Closed"],
+                index=1,  # Default to active markets
+                label_visibility="collapsed"
+            )
+        
+        with col_sort:
+            sort_by = st.selectbox(
+                "Sort",
+                ["volume_24h", "liquidity"],
+                format_func=lambda x: "24h Volume" if x == "volume_24h" else "Liquidity",
+                label_visibility="collapsed"
+            )
+        
+        with col_vol:
+            volume_min = st.number_input(
+                "Min volume",
+                min_value=0.0,
+                step=1000.0,
+                value=0.0,
+                label_visibility="collapsed",
+                placeholder="Min volume"
+            )
+        
+        with col_submit:
+            submitted = st.form_submit_button("Search", use_container_width=True)
     
-    with col_vol:
-        volume_min = st.number_input(
-            "Min volume",
-            min_value=0.0,
-            step=1000.0,
-            value=0.0,
-            label_visibility="collapsed",
-            placeholder="Min volume"
-        )
+    if submitted:
+        # New filters start from the first page of results
+        st.session_state.trading_page = 1
     
     # Determine filter parameters
     active = None
@@ -330,8 +355,11 @@ def _render_market_list(api: APIClient):
     elif status_filter == "Closed":
         active, closed = None, True
     
-    # Page size selector (smaller, right-aligned)
-    col_spacer, col_psize = st.columns([4, 1])
+    # Refresh and page size selector (smaller, right-aligned)
+    col_spacer, col_refresh, col_psize = st.columns([3, 1, 1])
+    with col_refresh:
+        # Cached lists live 30s; this fetches the current one right away
+        st.button("Refresh", use_container_width=True, on_click=_list_markets.clear)
     with col_psize:
         page_size = st.selectbox(
             "Per page",
@@ -340,9 +368,10 @@ def _render_market_list(api: APIClient):
             label_visibility="collapsed"
         )
     
-    # Fetch markets
-    resp = api.list_markets(
-        page=st.session_state.trading_page,
+    # Fetch markets. The prefetch below must pass the same arguments in the
+    # same order to hit the same cache entry.
+    page = st.session_state.trading_page
+    query = dict(
         page_size=page_size,
         search=search or None,
         active=active,
@@ -350,6 +379,7 @@ def _render_market_list(api: APIClient):
         volume_min=volume_min if volume_min > 0 else None,
         sort_by=sort_by,
     )
+    resp = _list_markets(api.base_url, st.session_state.token, page=page, **query)
     
     if resp["status"] != 200:
         err = resp.get("error") or resp.get("data", {}).get("detail", "Unable to fetch markets")
@@ -361,6 +391,10 @@ def _render_market_list(api: APIClient):
     total = data.get("total", len(markets)) if isinstance(data, dict) else len(markets)
     total_pages = data.get("total_pages", 1) if isinstance(data, dict) else 1
     
+    # Load the next page in the background so "Next" is served from cache
+    if page < total_pages:
+        _prefetch(_list_markets, api.base_url, st.session_state.token, page=page + 1, **query)
+    
     # Results count
     st.markdown(f"<p style='color: {COLORS['text_secondary']}; margin: 10px 0;'>Found <strong style='color: {COLORS['text_primary']};'>{total}</strong> markets</p>", unsafe_allow_html=True)
     
@@ -368,35 +402,41 @@ def _render_market_list(api: APIClient):
         st.info("No market found with these filters.")
         return
     
-    # Render cards in a grid (4 per row)
-    cards_per_row = 4
-    for row_start in range(0, len(markets), cards_per_row):
-        row_markets = markets[row_start:row_start + cards_per_row]
-        cols = st.columns(cards_per_row)
-        
-        for idx, (col, market) in enumerate(zip(cols, row_markets)):
-            with col:
-                global_idx = row_start + idx
-                slug = market.get("slug") or f"market-{global_idx}"
-                
-                # Card HTML (comportement initial, pas d'API injectée)
-                card_html = _create_market_card(market, global_idx)
-                st.markdown(card_html, unsafe_allow_html=True)
-                
-                # Button below card
-                if st.button("View details", key=f"detail_{slug}_{global_idx}", use_container_width=True):
-                    st.session_state.selected_market = slug
-                    st.session_state.trading_view = "detail"
-                    st.rerun()
+    # Render all cards as one grid (4 per row) in a single element
+    cards_html = "".join(
+        _create_market_card(market, idx).strip() for idx, market in enumerate(markets)
+    )
+    st.markdown(
+        f"<div style='display: grid; grid-template-columns: repeat(4, minmax(0, 1fr)); gap: 16px;'>{cards_html}</div>",
+        unsafe_allow_html=True
+    )
+    
+    # One selector opens a market. Links inside the grid would reload the
+    # page and start a new session, which logs the user out.
+    names = {m["slug"]: _display_name(m) for m in markets if m.get("slug")}
+    st.selectbox(
+        "Open a market",
+        options=list(names),
+        index=None,
+        format_func=names.get,
+        placeholder="View details of a market...",
+        key="market_grid_choice",
+        on_change=_open_market_from_grid,
+        label_visibility="collapsed"
+    )
     
     # Pagination
     st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
     col_prev, col_info, col_next = st.columns([1, 2, 1])
     
     with col_prev:
-        if st.button("← Previous", disabled=st.session_state.trading_page <= 1, use_container_width=True):
-            st.session_state.trading_page -= 1
-            st.rerun()
+        st.button(
+            "← Previous",
+            disabled=st.session_state.trading_page <= 1,
+            use_container_width=True,
+            on_click=_turn_market_page,
+            args=(-1,),
+        )
     
     with col_info:
         st.markdown(
@@ -405,11 +445,37 @@ def _render_market_list(api: APIClient):
         )
     
     with col_next:
-        if st.button("Next →", disabled=st.session_state.trading_page >= total_pages, use_container_width=True):
-            st.session_state.trading_page += 1
-            st.rerun()
+        st.button(
+            "Next →",
+            disabled=st.session_state.trading_page >= total_pages,
+            use_container_width=True,
+            on_click=_turn_market_page,
+            args=(1,),
+        )
+
+
+
+_PREFILL_KEYS = ("prefill_action", "prefill_outcome", "prefill_max_qty", "prefill_use_max", "prefill_portfolio_id")
 
 
+def _back_to_markets(api: APIClient, slug: str):
+    """Leave the market detail view; runs as a callback so one rerun shows the list."""
+    # Stop stream si actif
+    if st.session_state.get("active_market_slug") == slug and st.session_state.get("market_stream_started"):
+        api.stop_stream()
+        st.session_state["market_stream_started"] = False
+        st.session_state["active_market_slug"] = None
+    
+    # Clear prefill state
+    for key in _PREFILL_KEYS:
+        st.session_state.pop(key, None)
+    
+    # Vider l'orderbook
+    st.session_state.pop("orderbook", None)
+    
+    st.session_state.trading_view = "list"
+    st.session_state.selected_market = None
+
 
 def _render_market_detail(api: APIClient):
     # Détermination dynamique de la fermeture du marché
@@ -421,9 +487,7 @@ def _render_market_detail(api: APIClient):
         return
 
     with st.spinner("Chargement du marché..."):
-        resp = api.get_market(slug)
-        if resp["status"] != 200:
-            resp = api.get_market_by_condition(slug)
+        resp = _resolve_market(api.base_url, st.session_state.token, slug)
     if resp["status"] != 200:
         st.error(f"Impossible de charger le marché: {slug}")
         return
@@ -431,76 +495,15 @@ def _render_market_detail(api: APIClient):
     name = _display_name(market)
     asset_ids = market.get("clob_token_ids", [])
     end_date = market.get("end_date")
-    if end_date:
-        try:
-            # Supporte string ou datetime
-            if isinstance(end_date, str):
-                # Si la date ne contient pas d'heure, on complète à 23:59:59
-                if 'T' not in end_date:
-                    end_date_full = end_date.strip() + 'T23:59:59+00:00'
-                else:
-                    # Si l'heure est à minuit, on remplace par 23:59:59
-                    date_part, time_part = end_date.split('T')
-                    if time_part.startswith('00:00:00'):
-                        end_date_full = date_part + 'T23:59:59+00:00'
-                    else:
-                        end_date_full = end_date.replace("Z", "+00:00")
-                end_dt = datetime.fromisoformat(end_date_full)
-            else:
-                end_dt = end_date
-            now = datetime.utcnow().replace(tzinfo=end_dt.tzinfo)
-            # Le marché est clôturé uniquement si la date de fin est strictement dépassée
-            if now > end_dt:
-                is_closed = True
-        except Exception:
-            # fallback sur le champ closed si parsing échoue
-            is_closed = market.get("closed", False)
-    else:
-        is_closed = market.get("closed", False)
+    # Le marché est clôturé uniquement si la date de fin est strictement dépassée
+    is_closed = _market_is_closed(market, end_date)
 
     
 
 
-    if st.button("← Back to markets"):
-        # Stop stream si actif
-        if st.session_state.get("active_market_slug") == slug and st.session_state.get("market_stream_started"):
-            api.stop_stream()
-            st.session_state["market_stream_started"] = False
-            st.session_state["active_market_slug"] = None
-        
-        # Clear prefill state
-        for key in ["prefill_action", "prefill_outcome", "prefill_max_qty", "prefill_use_max", "prefill_portfolio_id"]:
-            st.session_state.pop(key, None)
-        
-        # Vider l'orderbook
-        st.session_state.pop("orderbook", None)
-        
-        st.session_state.trading_view = "list"
-        st.session_state.selected_market = None
-        st.rerun()
-        return
-
+    st.button("← Back to markets", on_click=_back_to_markets, args=(api, slug))
 
 
-    # ===============================
-    # Fetch market data
-    # ===============================
-    with st.spinner("Chargement du marché..."):
-        resp = api.get_market(slug)
-        if resp["status"] != 200:
-            resp = api.get_market_by_condition(slug)
-    
-    if resp["status"] != 200:
-        st.error(f"Impossible de charger le marché: {slug}")
-        return
-
-    market = resp["data"]
-    name = _display_name(market)
-    asset_ids = market.get("clob_token_ids", [])
-    # st.write(   "Asset IDs:", asset_ids)
-    # st.write("Asset IDs:", asset_ids)
-    # Détermination dynamique de la fermeture du marché
-    end_date = market.get("end_date")
 
     # ===============================
     # Manage stream
@@ -552,6 +555,9 @@ def _render_market_detail(api: APIClient):
     
     st.markdown("---")
     
+    # User portfolios, shared by the position panel and the order form
+    portfolios_resp = _list_portfolios(api.base_url, st.session_state.token)
+    
     # Two columns: Chart + Current prices | Trading panel
     col_chart, col_trade = st.columns([2, 1])
     
@@ -561,10 +567,12 @@ def _render_market_detail(api: APIClient):
         outcomes = market.get("outcomes") or []
         slug = market.get("slug")
         price_cols = st.columns(len(outcomes)) if outcomes else []
-        for i, outcome in enumerate(outcomes):
+        # Récupérer l'historique de chaque outcome en parallèle
+        price_resps = _parallel_get(
+            [(_get_price_history, api.base_url, st.session_state.token, slug, i) for i in range(len(outcomes))]
+        )
+        for i, (outcome, price_resp) in enumerate(zip(outcomes, price_resps)):
             with price_cols[i]:
-                # Récupérer l'historique pour chaque outcome
-                price_resp = api.get_price_history(slug, outcome_index=i)
                 if price_resp["status"] == 200:
                     price_data = price_resp.get("data") or {}
                     price_history = price_data.get("history", [])
@@ -573,7 +581,12 @@ def _render_market_detail(api: APIClient):
                         p = last_point.get("price") or last_point.get("p")
                         try:
                             price_pct = float(p) * 100
-                            color = COLORS["accent_green"] if outcome.upper() == "YES" else COLORS["accent_red"]
+                        except (TypeError, ValueError):
+                            price_pct = None
+                        if price_pct is None:
+                            st.write(f"{outcome}: —")
+                        else:
+                            color = COLORS["accent_green"] if str(outcome).upper() == "YES" else COLORS["accent_red"]
                             st.markdown(
                                 f"""
                                 <div style='background: {COLORS['bg_secondary']}; padding: 20px; border-radius: 8px; text-align: center; border: 1px solid {COLORS['border']};'>
@@ -583,8 +596,6 @@ def _render_market_detail(api: APIClient):
                                 """,
                                 unsafe_allow_html=True
                             )
-                        except:
-                            st.write(f"{outcome}: —")
                     else:
                         st.write(f"{outcome}: —")
                 else:
@@ -593,24 +604,25 @@ def _render_market_detail(api: APIClient):
         # Price history chart - synchronized with the token selected in the order form
         st.markdown("### Price history")
         selected_token = st.session_state.get("order_token", outcomes[0] if outcomes else "Yes")
+        st.session_state["chart_token"] = selected_token
         chart_outcome_index = 0
         for i, o in enumerate(outcomes):
             if o == selected_token:
                 chart_outcome_index = i
                 break
         is_no_token = selected_token.upper() in ["NO", "NON"] if selected_token else False
-        price_resp = api.get_price_history(slug, outcome_index=chart_outcome_index)
+        price_resp = _get_price_history(api.base_url, st.session_state.token, slug, chart_outcome_index)
         if price_resp["status"] == 200:
             price_data = price_resp.get("data") or {}
             price_history = price_data.get("history", [])
             chart_label = f"{name} ({selected_token})" if selected_token else name
             fig = _create_price_chart(price_history, chart_label, is_no=is_no_token)
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key="price_history_chart")
         else:
             st.info("Price history not available")
         
         # Display position if user has one on this market
-        _render_position_panel(api, market)
+        _render_position_panel(api, market, portfolios_resp)
     
 
     orderbook_container = st.empty()
@@ -643,15 +655,19 @@ def _render_market_detail(api: APIClient):
         if is_closed:
             st.warning("This market is closed. Trading is not possible.")
         else:
-            _render_trade_form(api, market)
+            _render_trade_form(api, market, portfolios_resp)
 
 
 
 
-def _render_trade_form(api: APIClient, market: dict):
-    """Render the compact trading form."""
-    # Get portfolios
-    portfolios_resp = api.list_portfolios()
+@st.fragment
+def _render_trade_form(api: APIClient, market: dict, portfolios_resp: dict):
+    """
+    Render the compact trading form.
+    
+    Runs as a fragment so that editing the order reruns only the form,
+    not the market data, charts and positions around it.
+    """
     if portfolios_resp["status"] != 200:
         st.error("Unable to load portfolios")
         return
@@ -673,6 +689,8 @@ def _render_trade_form(api: APIClient, market: dict):
     if not outcomes or not outcome_prices:
         st.warning("Données de prix non disponibles")
         return
+    # Outcomes normalized once, for prefill and position matching
+    norm_outcomes = [_normalize_outcome(o) for o in outcomes]
     
     # Require orderbook presence; no fallback price from market data
     moc_price = None
@@ -681,15 +699,9 @@ def _render_trade_form(api: APIClient, market: dict):
     prefill_portfolio_id = st.session_state.get("prefill_portfolio_id")
     
     # Portfolio selection
-    portfolio_ids = []
-    portfolio_by_id = {}
-    for p in portfolios:
-        pid = p.get("_id") or p.get("id")
-        if pid is None:
-            continue
-        pid = str(pid)
-        portfolio_ids.append(pid)
-        portfolio_by_id[pid] = p
+    portfolios = [p for p in portfolios if p.get("_id") or p.get("id")]
+    portfolio_ids = [str(p.get("_id") or p.get("id")) for p in portfolios]
+    portfolio_by_id = dict(zip(portfolio_ids, portfolios))
     
     default_idx = 0
     if prefill_portfolio_id and str(prefill_portfolio_id) in portfolio_ids:
@@ -704,7 +716,10 @@ def _render_trade_form(api: APIClient, market: dict):
         key="order_portfolio"
     )
     selected_portfolio = portfolio_by_id[selected_portfolio_id]
-    # st.write(selected_portfolio_id)
+    # Identifiers this market's positions may be recorded under, by priority
+    market_keys = [position_market_id, market_slug, market.get("condition_id"), market.get("_id")]
+    market_keys = [str(k) for k in market_keys if k]
+    
     # Get current cash
     portfolio_detail = api.get_portfolio(selected_portfolio_id)
     current_cash = 0
@@ -734,35 +749,27 @@ def _render_trade_form(api: APIClient, market: dict):
         outcome_index = 0
         if prefill_outcome:
             norm_prefill = _normalize_outcome(prefill_outcome)
-            for i, o in enumerate(outcomes):
-                if _normalize_outcome(o) == norm_prefill:
-                    outcome_index = i
-                    break
+            if norm_prefill in norm_outcomes:
+                outcome_index = norm_outcomes.index(norm_prefill)
         outcome = st.selectbox("Token", outcomes, index=outcome_index, key="order_token")
+        # The price chart follows the selected token and lives outside the fragment
+        if outcome != st.session_state.get("chart_token"):
+            st.rerun()
     
-    # Get positions for sell validation
-    trades_resp = api.get_trades(selected_portfolio_id, page=1, page_size=100)
-    current_positions = {}
-    if trades_resp.get("status") == 200:
-        trades_data = trades_resp.get("data", {})
-        trades = trades_data.get("trades", []) if isinstance(trades_data, dict) else trades_data
-        for trade in trades:
-            key = (trade.get("market_id"), _normalize_outcome(trade.get("outcome")))
-            if key not in current_positions:
-                current_positions[key] = 0
-            qty = trade.get("quantity", 0)
-            if trade.get("side") == "buy":
-                current_positions[key] += qty
-            else:
-                current_positions[key] -= qty
+    # Positions for sell validation, only fetched when selling: quantity held
+    # of this outcome per market id
+    norm_outcome = norm_outcomes[outcomes.index(outcome)]
+    current_positions = defaultdict(float)
+    positions_resp = api.get_positions(selected_portfolio_id, False, market_keys) if action == "SELL" else {}
+    if positions_resp.get("status") == 200:
+        for pos in positions_resp.get("data") or []:
+            if _normalize_outcome(pos.get("outcome")) == norm_outcome:
+                current_positions[pos.get("market_id")] += pos.get("quantity", 0)
     
     # Available quantity for this outcome
-    market_keys = [position_market_id, market_slug, market.get("condition_id"), market.get("_id")]
-    market_keys = [str(k) for k in market_keys if k]
-    norm_outcome = _normalize_outcome(outcome)
     available_qty = 0
     for mk in market_keys:
-        available_qty = current_positions.get((mk, norm_outcome), available_qty)
+        available_qty = current_positions.get(mk, available_qty)
         if available_qty > 0:
             break
     
@@ -962,10 +969,7 @@ def _render_trade_form(api: APIClient, market: dict):
             # Use market slug for the trade
             trade_market_id = market_slug or position_market_id
 
-            # Determine orderbook for the selected token
-            orderbook = st.session_state.get("orderbook") or {}
-
-            token_book = _find_token_book(orderbook, outcome, token_ids=market.get("clob_token_ids", []), outcomes_list=outcomes)
+            # token_book was resolved for the selected token above
 
             # Build level list (price, available) depending on side
             levels = []
@@ -1032,20 +1036,48 @@ def _render_trade_form(api: APIClient, market: dict):
                     st.error(f"Erreur niveau {exec_price}: {err}")
                     break
 
+            # Even a partial fill moved cash and positions
+            _clear_portfolio_cache()
             if all_ok:
-                st.success("Ordre(s) exécuté(s) sur l'orderbook")
-                for key in ["prefill_action", "prefill_outcome", "prefill_max_qty", "prefill_use_max", "prefill_portfolio_id"]:
+                for key in _PREFILL_KEYS:
                     st.session_state.pop(key, None)
-                st.balloons()
-                import time
-                time.sleep(1.0)
+                # A toast survives the rerun, so there is no need to hold the page first
+                st.toast("Ordre(s) exécuté(s) sur l'orderbook", icon="🎉")
                 st.rerun()
 
 
+def _apply_market_link():
+    """Open the market named by ?market= once, the first time the session shows this page."""
+    if st.session_state.get("market_link_read"):
+        return
+    st.session_state.market_link_read = True
+    slug = st.query_params.get("market")
+    if slug:
+        st.session_state.selected_market = slug
+        st.session_state.trading_view = "detail"
+
+
+def _sync_market_link():
+    """
+    Mirror the open market into ?market= so the page can be shared.
+    
+    Updating st.query_params rewrites the URL in place without reloading
+    the page, so the session and its login are kept.
+    """
+    slug = st.session_state.selected_market if st.session_state.trading_view == "detail" else None
+    if slug:
+        if st.query_params.get("market") != slug:
+            st.query_params["market"] = slug
+    elif "market" in st.query_params:
+        del st.query_params["market"]
+
+
 def render():
     """Main render function."""
     _init_state()
-    api = APIClient(API_URL)
+    _apply_market_link()
+    _sync_market_link()
+    api = get_api_client(API_URL)
     # Remove orderbook from session state when leaving the trading detail view
     if st.session_state.get("trading_view") != "detail" and "orderbook" in st.session_state:
         st.session_state.pop("orderbook", None)
@@ -6,6 +6,7 @@ for testing FastAPI routes, services, and database operations.
 """
 
 import sys
+from contextlib import ExitStack
 from pathlib import Path
 from typing import AsyncGenerator
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -138,37 +139,88 @@ def mock_portfolio_service():
 # App Override Helpers
 # =============================================================================
 
-@pytest.fixture
-def app_with_mocks(mock_async_mongo_client, mock_async_redis):
+# Modules that bind the connection getters at import time; each binding is
+# patched so the lifespan and every route see the mock databases
+MONGO_CLIENT_TARGETS = (
+    "app.database.connections.get_mongo_client",
+    "app.main.get_mongo_client",
+    "app.dependencies.auth.get_mongo_client",
+    "app.routers.auth.get_mongo_client",
+    "app.routers.health.get_mongo_client",
+    "app.routers.markets.get_mongo_client",
+    "app.routers.portfolios.get_mongo_client",
+    "app.routers.ws.get_mongo_client",
+)
+REDIS_CLIENT_TARGETS = (
+    "app.database.connections.get_redis_client",
+    "app.routers.health.get_redis_client",
+)
+
+
+@pytest.fixture(scope="module")
+def module_databases():
+    """
+    Mock MongoDB and Redis clients shared by the module-wide app.
+
+    client_with_mocks empties them after each test that uses it.
+    """
+    try:
+        import fakeredis.aioredis
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        pytest.skip("mongomock-motor or fakeredis not installed")
+    return AsyncMongoMockClient(), fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture(scope="module")
+def app_with_mocks(request, module_databases):
     """
     Create the FastAPI app with database connections mocked.
     
-    This fixture patches the database connection functions before
-    importing the app, ensuring all routes use mock databases.
+    The patches are entered once per test module and undone by a
+    finalizer, so they never leak into tests of other files.
     """
-    with patch("app.database.connections.get_mongo_client") as mock_mongo, \
-         patch("app.database.connections.get_redis_client") as mock_redis:
-        
-        async def get_mongo():
-            return mock_async_mongo_client
-        
-        async def get_redis():
-            return mock_async_redis
-        
-        mock_mongo.side_effect = get_mongo
-        mock_redis.side_effect = get_redis
-        
-        from app.main import app
-        yield app
+    mongo, redis = module_databases
 
+    async def get_mongo():
+        return mongo
 
-@pytest.fixture
-def client_with_mocks(app_with_mocks):
-    """TestClient using the mocked app."""
+    async def get_redis():
+        return redis
+
+    stack = ExitStack()
+    request.addfinalizer(stack.close)
+    for target in MONGO_CLIENT_TARGETS:
+        stack.enter_context(patch(target, side_effect=get_mongo))
+    for target in REDIS_CLIENT_TARGETS:
+        stack.enter_context(patch(target, side_effect=get_redis))
+
+    from app.main import app
+    return app
+
+
+@pytest.fixture(scope="module")
+def _module_client(request, app_with_mocks):
+    """TestClient using the mocked app, with the lifespan run once per module."""
     from fastapi.testclient import TestClient
-    
-    with TestClient(app_with_mocks) as c:
-        yield c
+
+    stack = ExitStack()
+    request.addfinalizer(stack.close)
+    return stack.enter_context(TestClient(app_with_mocks))
+
+
+@pytest.fixture
+def client_with_mocks(_module_client, module_databases):
+    """TestClient using the mocked app; the mock databases are emptied after the test."""
+    yield _module_client
+    mongo, redis = module_databases
+
+    async def _reset():
+        for name in await mongo.list_database_names():
+            await mongo.drop_database(name)
+        await redis.flushall()
+
+    _module_client.portal.call(_reset)
 
 
 # =============================================================================
@@ -176,30 +228,21 @@ def client_with_mocks(app_with_mocks):
 # =============================================================================
 
 @pytest.fixture
-def bypass_auth(mock_current_user):
+def bypass_auth(app_with_mocks, mock_current_user):
     """
-    Fixture to bypass authentication in tests.
+    Bypass authentication in tests.
+    
+    Overrides get_current_active_user on the app for the duration of the test.
     
     Usage:
-        def test_protected_route(client, bypass_auth):
-            with bypass_auth:
-                response = client.get("/protected?token=any")
+        def test_protected_route(client_with_mocks, bypass_auth):
+            response = client_with_mocks.get("/protected?token=any")
     """
     from app.dependencies.auth import get_current_active_user
     
-    class AuthBypass:
-        def __enter__(self):
-            self.patcher = patch(
-                "app.dependencies.auth.get_current_active_user",
-                return_value=mock_current_user
-            )
-            self.patcher.start()
-            return self
-        
-        def __exit__(self, *args):
-            self.patcher.stop()
-    
-    return AuthBypass()
+    app_with_mocks.dependency_overrides[get_current_active_user] = lambda: mock_current_user
+    yield
+    app_with_mocks.dependency_overrides.pop(get_current_active_user, None)
 
 
 @pytest.fixture
@@ -10,25 +10,34 @@ These tests cover:
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
+import app.database.connections as conn_module
+from app.database.connections import close_connections, get_mongo_client, get_redis_client
 
+
+@pytest.fixture
+def patched_settings():
+    """Patch connection settings with local Mongo and Redis addresses."""
+    with patch("app.database.connections.get_settings") as mock_settings:
+        mock_settings.return_value.mongo_uri = "mongodb://test:27017"
+        mock_settings.return_value.redis_host = "localhost"
+        mock_settings.return_value.redis_port = 6379
+        yield mock_settings
+
+
+@pytest.mark.xdist_group("conn_globals")
 class TestMongoDBConnection:
     """Tests for MongoDB connection handling."""
 
     @pytest.mark.asyncio
-    async def test_get_mongo_client_creates_connection(self):
+    async def test_get_mongo_client_creates_connection(self, patched_settings):
         """get_mongo_client should create connection on first call."""
         with patch("app.database.connections.AsyncIOMotorClient") as mock_client, \
-             patch("app.database.connections._mongo_client", None), \
-             patch("app.database.connections.get_settings") as mock_settings:
+             patch("app.database.connections._mongo_client", None):
             
-            mock_settings.return_value.mongo_uri = "mongodb://test:27017"
             mock_instance = MagicMock()
             mock_client.return_value = mock_instance
             
-            from app.database.connections import get_mongo_client
-            
             # Reset global state for this test
-            import app.database.connections as conn_module
             conn_module._mongo_client = None
             
             client = await get_mongo_client()
@@ -42,11 +51,9 @@ class TestMongoDBConnection:
         mock_mongo = MagicMock()
         mock_redis = AsyncMock()
         
-        import app.database.connections as conn_module
         conn_module._mongo_client = mock_mongo
         conn_module._redis_client = mock_redis
         
-        from app.database.connections import close_connections
         await close_connections()
         
         mock_mongo.close.assert_called_once()
@@ -78,53 +85,44 @@ class TestDatabaseRegistry:
 class TestIndexCreation:
     """Tests for index creation on collections."""
 
-    @pytest.mark.asyncio
-    async def test_indexes_created_on_markets_collection(self, mock_markets_db):
-        """Markets collection should have proper indexes."""
-        # Get index info
-        indexes = await mock_markets_db.markets.index_information()
-        
-        # Should have indexes (at minimum _id and slug)
-        assert len(indexes) > 0
-        
-        # Slug index should exist
-        assert any("slug" in str(idx) for idx in indexes.values())
-
-    @pytest.mark.asyncio
-    async def test_indexes_created_on_users_collection(self, mock_auth_db):
-        """Users collection should have email index."""
-        indexes = await mock_auth_db.users.index_information()
-        
-        # Email index should exist
-        assert any("email" in str(idx) for idx in indexes.values())
+    @pytest.fixture
+    def indexed_collection(self, request):
+        """Collection from the mock database fixture named in the parameter."""
+        db_fixture, collection = request.param
+        return request.getfixturevalue(db_fixture)[collection]
 
     @pytest.mark.asyncio
-    async def test_indexes_created_on_portfolios_collection(self, mock_trading_db):
-        """Portfolios collection should have user_id index."""
-        indexes = await mock_trading_db.portfolios.index_information()
+    @pytest.mark.parametrize(
+        "indexed_collection,field",
+        [
+            (("mock_markets_db", "markets"), "slug"),
+            (("mock_auth_db", "users"), "email"),
+            (("mock_trading_db", "portfolios"), "user_id"),
+        ],
+        indirect=["indexed_collection"],
+    )
+    async def test_indexes_created(self, indexed_collection, field):
+        """Each collection should have an index on its lookup field."""
+        indexes = await indexed_collection.index_information()
         
-        # user_id index should exist
-        assert any("user_id" in str(idx) for idx in indexes.values())
+        # Single-field ascending indexes are named <field>_1
+        assert f"{field}_1" in indexes
 
 
+@pytest.mark.xdist_group("conn_globals")
 class TestRedisConnection:
     """Tests for Redis connection handling."""
 
     @pytest.mark.asyncio
-    async def test_get_redis_client_creates_connection(self):
+    async def test_get_redis_client_creates_connection(self, patched_settings):
         """get_redis_client should create connection on first call."""
-        with patch("app.database.connections.Redis") as mock_redis_cls, \
-             patch("app.database.connections.get_settings") as mock_settings:
+        with patch("app.database.connections.Redis") as mock_redis_cls:
             
-            mock_settings.return_value.redis_host = "localhost"
-            mock_settings.return_value.redis_port = 6379
             mock_instance = AsyncMock()
             mock_redis_cls.return_value = mock_instance
             
-            import app.database.connections as conn_module
             conn_module._redis_client = None
             
-            from app.database.connections import get_redis_client
             client = await get_redis_client()
             
             mock_redis_cls.assert_called_once_with(
@@ -14,110 +14,78 @@ from unittest.mock import AsyncMock, patch
 class TestHealthEndpoint:
     """Tests for GET /health endpoint."""
 
-    def test_health_endpoint_returns_200_when_api_running(self, client):
+    @pytest.mark.asyncio
+    async def test_health_endpoint_returns_200_when_api_running(self, async_client):
         """Basic health check should return 200 if API is up."""
-        response = client.get("/health")
+        response = await async_client.get("/health")
         
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
 
 
+@pytest.fixture
+def mock_health_clients():
+    """Patch the readiness check's database getters, yielding both mocks."""
+    with patch("app.routers.health.get_mongo_client") as mock_mongo, \
+         patch("app.routers.health.get_redis_client") as mock_redis:
+        yield mock_mongo, mock_redis
+
+
+@pytest.fixture
+def healthy_mongo():
+    """MongoDB client mock whose ping succeeds."""
+    client = AsyncMock()
+    client.admin.command = AsyncMock(return_value={"ok": 1})
+    return client
+
+
+@pytest.fixture
+def healthy_redis():
+    """Redis client mock whose ping succeeds."""
+    client = AsyncMock()
+    client.ping = AsyncMock(return_value=True)
+    return client
+
+
 class TestReadinessEndpoint:
     """Tests for GET /health/ready endpoint."""
 
-    def test_readiness_returns_200_when_all_services_healthy(
-        self, client, mock_async_mongo_client, mock_async_redis
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "mongo_ok,redis_ok,expected_status",
+        [
+            (True, True, "healthy"),
+            (False, True, "degraded"),
+            (True, False, "degraded"),
+            (False, False, "degraded"),
+        ],
+    )
+    async def test_readiness_reports_each_service(
+        self, async_client, mock_health_clients, healthy_mongo, healthy_redis,
+        mongo_ok, redis_ok, expected_status,
     ):
-        """Readiness check should return 200 when all dependencies are up."""
-        with patch("app.routers.health.get_mongo_client") as mock_mongo, \
-             patch("app.routers.health.get_redis_client") as mock_redis:
-            
-            # Mock successful connections
-            mock_mongo_client = AsyncMock()
-            mock_mongo_client.admin.command = AsyncMock(return_value={"ok": 1})
-            mock_mongo.return_value = mock_mongo_client
-            
-            mock_redis_client = AsyncMock()
-            mock_redis_client.ping = AsyncMock(return_value=True)
-            mock_redis.return_value = mock_redis_client
-            
-            response = client.get("/health/ready")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "healthy"
-            assert data["checks"]["mongodb"] == "healthy"
-            assert data["checks"]["redis"] == "healthy"
-
-    def test_readiness_reports_mongodb_unhealthy_when_connection_fails(self, client):
-        """Readiness should report MongoDB unhealthy when it fails."""
-        with patch("app.routers.health.get_mongo_client") as mock_mongo, \
-             patch("app.routers.health.get_redis_client") as mock_redis:
-            
-            # MongoDB fails
+        """Readiness should report each dependency and degrade when one fails."""
+        mock_mongo, mock_redis = mock_health_clients
+        
+        if mongo_ok:
+            mock_mongo.return_value = healthy_mongo
+        else:
             mock_mongo.side_effect = Exception("Connection refused")
-            
-            # Redis succeeds
-            mock_redis_client = AsyncMock()
-            mock_redis_client.ping = AsyncMock(return_value=True)
-            mock_redis.return_value = mock_redis_client
-            
-            response = client.get("/health/ready")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "degraded"
-            assert "unhealthy" in data["checks"]["mongodb"]
-
-    def test_readiness_reports_redis_unhealthy_when_connection_fails(self, client):
-        """Readiness should report Redis unhealthy when it fails."""
-        with patch("app.routers.health.get_mongo_client") as mock_mongo, \
-             patch("app.routers.health.get_redis_client") as mock_redis:
-            
-            # MongoDB succeeds
-            mock_mongo_client = AsyncMock()
-            mock_mongo_client.admin.command = AsyncMock(return_value={"ok": 1})
-            mock_mongo.return_value = mock_mongo_client
-            
-            # Redis fails
+        
+        if redis_ok:
+            mock_redis.return_value = healthy_redis
+        else:
             mock_redis.side_effect = Exception("Connection refused")
-            
-            response = client.get("/health/ready")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "degraded"
-            assert "unhealthy" in data["checks"]["redis"]
-
-    def test_readiness_returns_degraded_when_all_services_down(self, client):
-        """Readiness should return degraded when all services fail."""
-        with patch("app.routers.health.get_mongo_client") as mock_mongo, \
-             patch("app.routers.health.get_redis_client") as mock_redis:
-            
-            mock_mongo.side_effect = Exception("MongoDB down")
-            mock_redis.side_effect = Exception("Redis down")
-            
-            response = client.get("/health/ready")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "degraded"
-            assert "unhealthy" in data["checks"]["mongodb"]
-            assert "unhealthy" in data["checks"]["redis"]
-
-    def test_readiness_response_includes_all_check_keys(self, client):
-        """Readiness response should include all dependency checks."""
-        with patch("app.routers.health.get_mongo_client") as mock_mongo, \
-             patch("app.routers.health.get_redis_client") as mock_redis:
-            
-            mock_mongo.side_effect = Exception("test")
-            mock_redis.side_effect = Exception("test")
-            
-            response = client.get("/health/ready")
-            
-            data = response.json()
-            assert "checks" in data
-            assert "api" in data["checks"]
-            assert "mongodb" in data["checks"]
-            assert "redis" in data["checks"]
+        
+        response = await async_client.get("/health/ready")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == expected_status
+        assert set(data["checks"]) >= {"api", "mongodb", "redis"}
+        for name, ok in (("mongodb", mongo_ok), ("redis", redis_ok)):
+            if ok:
+                assert data["checks"][name] == "healthy"
+            else:
+                assert "unhealthy" in data["checks"][name]
@@ -0,0 +1,57 @@
+"""
+Tests for the portfolios router.
+
+These tests cover:
+- If-None-Match handling for the trade history ETag
+- Creating and listing portfolios through the mocked app
+"""
+
+import pytest
+
+from app.routers.portfolios import etag_matches
+
+
+class TestEtagMatches:
+    """Tests for etag_matches function."""
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"xyz", "abc"', True),
+            ("*", True),
+            ('"xyz"', False),
+            ("", False),
+            (None, False),
+        ],
+    )
+    def test_matches_header_forms(self, header, expected):
+        """Lists, wildcards and weak tags should all be recognized."""
+        assert etag_matches(header, '"abc"') is expected
+
+
+class TestPortfolioRoutes:
+    """Route tests against the mocked databases, in file order."""
+
+    def test_create_then_list(self, client_with_mocks, bypass_auth):
+        """A created portfolio should be listed for its owner."""
+        response = client_with_mocks.post(
+            "/portfolios?token=any", json={"name": "Route test"}
+        )
+        assert response.status_code == 201
+
+        response = client_with_mocks.get("/portfolios?token=any")
+        assert response.status_code == 200
+        assert [p["name"] for p in response.json()] == ["Route test"]
+
+    def test_databases_reset_between_tests(
+        self, client_with_mocks, bypass_auth, module_databases
+    ):
+        """The portfolio from the previous test should be gone."""
+        mongo, _ = module_databases
+        assert client_with_mocks.portal.call(mongo.list_database_names) == []
+
+        response = client_with_mocks.get("/portfolios?token=any")
+        assert response.status_code == 200
+        assert response.json() == []
@@ -8,59 +8,62 @@ These tests cover:
 - PolymarketAPI (response parsing)
 """
 
+import asyncio
+import json
+
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, timezone
+from types import MappingProxyType
+
+from app.core.security import hash_password, verify_password
+from app.services.market_service import MarketService
+from app.services.portfolio_service import PortfolioService
 
 
 # =============================================================================
 # Password Hashing Tests (app.core.security)
 # =============================================================================
 
+@pytest.fixture(scope="module")
+def canonical_hash():
+    """One (password, bcrypt hash) pair shared by the hashing tests."""
+    password = "TestPassword123!"
+    return password, hash_password(password)
+
+
 class TestPasswordHashing:
     """Tests for password hashing functions in app.core.security."""
 
-    def test_hash_password_returns_bcrypt_hash(self):
+    def test_hash_password_returns_bcrypt_hash(self, canonical_hash):
         """hash_password should return bcrypt hash."""
-        from app.core.security import hash_password
-        
-        password = "TestPassword123!"
-        hashed = hash_password(password)
+        password, hashed = canonical_hash
         
         # bcrypt hashes start with $2b$
         assert hashed.startswith("$2b$")
         assert hashed != password
 
-    def test_verify_password_correct_returns_true(self):
+    def test_verify_password_correct_returns_true(self, canonical_hash):
         """verify_password with correct password should return True."""
-        from app.core.security import hash_password, verify_password
-        
-        password = "TestPassword123!"
-        hashed = hash_password(password)
+        password, hashed = canonical_hash
         
         result = verify_password(password, hashed)
         
         assert result is True
 
-    def test_verify_password_wrong_returns_false(self):
+    def test_verify_password_wrong_returns_false(self, canonical_hash):
         """verify_password with wrong password should return False."""
-        from app.core.security import hash_password, verify_password
-        
-        password = "TestPassword123!"
         wrong_password = "WrongPassword123!"
-        hashed = hash_password(password)
+        _, hashed = canonical_hash
         
         result = verify_password(wrong_password, hashed)
         
         assert result is False
 
-    def test_hash_password_different_each_time(self):
+    def test_hash_password_different_each_time(self, canonical_hash):
         """hash_password should produce different hashes (salt)."""
-        from app.core.security import hash_password
-        
-        password = "TestPassword123!"
+        password, hash1 = canonical_hash
         
-        hash1 = hash_password(password)
         hash2 = hash_password(password)
         
         # Same password should produce different hashes due to salt
@@ -71,66 +74,102 @@ class TestPasswordHashing:
 # MarketService Tests
 # =============================================================================
 
+@pytest.fixture(scope="module")
+def market_doc_template():
+    """Read-only cached market fields shared by the MarketService tests."""
+    return MappingProxyType({
+        "condition_id": "0x123",
+        "outcomes": ["Yes", "No"],
+        "outcome_prices": ["0.65", "0.35"],
+        "clob_token_ids": ["token1", "token2"],
+        "volume_total": 1000000,
+        "volume_24h": 50000,
+        "liquidity": 100000,
+    })
+
+
 class TestMarketServiceCache:
     """Tests for MarketService caching behavior."""
 
     @pytest.mark.asyncio
     async def test_get_market_cache_hit_returns_from_db(
-        self, mock_markets_db, market_fixture_fed_october
+        self, mock_markets_db, market_fixture_fed_october, market_doc_template
     ):
         """Getting cached market should return from DB without API call."""
-        from app.services.market_service import MarketService
-        
         # Pre-populate cache with required fields for _doc_to_detail_response
+        slug = market_fixture_fed_october["slug"]
         market_doc = {
-            "_id": market_fixture_fed_october["slug"],
-            "slug": market_fixture_fed_october["slug"],
-            "condition_id": "0x123",
+            **market_doc_template,
+            "_id": slug,
+            "slug": slug,
             "question": market_fixture_fed_october.get("question", "Test question?"),
-            "outcomes": ["Yes", "No"],
-            "outcome_prices": ["0.65", "0.35"],
-            "clob_token_ids": ["token1", "token2"],
-            "volume_total": 1000000,
-            "volume_24h": 50000,
-            "liquidity": 100000,
             "closed": market_fixture_fed_october.get("closed", False),
             "active": market_fixture_fed_october.get("active", True),
         }
         await mock_markets_db.markets.insert_one(market_doc)
         
-        service = MarketService(mock_markets_db)
+        mock_api = AsyncMock()
+        service = MarketService(mock_markets_db, polymarket_api=mock_api)
         
-        with patch("app.services.market_service.get_polymarket_api") as mock_api:
-            result = await service.get_market_by_slug(market_fixture_fed_october["slug"])
-            
-            # API should not be called for cached market
-            mock_api.assert_not_called()
-            assert result is not None
+        result = await service.get_market_by_slug(market_fixture_fed_october["slug"])
+        
+        # API should not be called for cached market
+        mock_api.get_market_by_slug.assert_not_called()
+        assert result is not None
 
     @pytest.mark.asyncio
     async def test_get_market_cache_miss_fetches_from_api(self, mock_markets_db):
         """Getting uncached market should fetch from API."""
-        from app.services.market_service import MarketService
+        mock_api = AsyncMock()
+        mock_api.get_market_by_slug.return_value = None  # Simulate not found
+        service = MarketService(mock_markets_db, polymarket_api=mock_api)
         
-        service = MarketService(mock_markets_db)
+        # Market not in DB, should trigger API fetch
+        result = await service.get_market_by_slug("nonexistent-market")
         
-        with patch("app.services.market_service.get_polymarket_api") as mock_get_api:
-            mock_api = AsyncMock()
-            mock_api.get_market_by_slug.return_value = None  # Simulate not found
-            mock_get_api.return_value = mock_api
-            
-            # Market not in DB, should trigger API fetch
-            result = await service.get_market_by_slug("nonexistent-market")
-            
-            # Should have attempted API fetch
-            mock_get_api.assert_called_once()
-            mock_api.get_market_by_slug.assert_called_once_with("nonexistent-market")
+        # Should have attempted API fetch
+        mock_api.get_market_by_slug.assert_called_once_with("nonexistent-market")
+
+    @pytest.mark.asyncio
+    async def test_resolve_market_by_condition_id_hits_cache(self, mock_markets_db):
+        """Resolving a cached condition ID should not call the API."""
+        await mock_markets_db.markets.insert_one({
+            "_id": "test-market",
+            "slug": "test-market",
+            "condition_id": "0xabc",
+            "question": "Test question?",
+            "outcomes": ["Yes", "No"],
+            "outcome_prices": ["0.65", "0.35"],
+            "clob_token_ids": ["token1", "token2"],
+        })
+        
+        mock_api = AsyncMock()
+        service = MarketService(mock_markets_db, polymarket_api=mock_api)
+        
+        result = await service.resolve_market("0xabc")
+        
+        mock_api.get_market_by_slug.assert_not_called()
+        mock_api.get_market_by_condition_id.assert_not_called()
+        assert result is not None
+        assert result.slug == "test-market"
+
+    @pytest.mark.asyncio
+    async def test_resolve_market_cache_miss_tries_slug_then_condition(self, mock_markets_db):
+        """Unresolved keys should be tried as slug, then as condition ID."""
+        mock_api = AsyncMock()
+        mock_api.get_market_by_slug.return_value = None
+        mock_api.get_market_by_condition_id.return_value = None
+        service = MarketService(mock_markets_db, polymarket_api=mock_api)
+        
+        result = await service.resolve_market("0xmissing")
+        
+        assert result is None
+        mock_api.get_market_by_slug.assert_called_once_with("0xmissing")
+        mock_api.get_market_by_condition_id.assert_called_once_with("0xmissing")
 
     @pytest.mark.asyncio
     async def test_save_market_stores_in_mongodb(self, mock_markets_db):
         """Saving market should store in MongoDB."""
-        from app.services.market_service import MarketService
-        
         service = MarketService(mock_markets_db)
         
         market_data = {
@@ -158,30 +197,30 @@ class TestMarketServiceCache:
 class TestPortfolioServiceCalculations:
     """Tests for PortfolioService calculations."""
 
+    @pytest.mark.skip(reason="no assertion yet; cash balance is covered by test_portfolio_summary_values_open_positions")
     @pytest.mark.asyncio
     async def test_calculate_balance_deducts_after_buy(self, mock_trading_db):
         """Balance should decrease after buy trade."""
-        from app.services.portfolio_service import PortfolioService
-        
-        # Insert portfolio
-        await mock_trading_db.portfolios.insert_one({
-            "_id": "portfolio_id",
-            "user_id": "user_id",
-            "initial_balance": 10000.0,
-        })
-        
-        # Insert buy trade
-        await mock_trading_db.trades.insert_one({
-            "portfolio_id": "portfolio_id",
-            "side": "BUY",
-            "quantity": 100,
-            "price": 0.65,  # Cost = 65
-        })
+        # Insert portfolio and buy trade
+        await asyncio.gather(
+            mock_trading_db.portfolios.insert_one({
+                "_id": "portfolio_id",
+                "user_id": "user_id",
+                "initial_balance": 10000.0,
+            }),
+            mock_trading_db.trades.insert_one({
+                "portfolio_id": "portfolio_id",
+                "side": "BUY",
+                "quantity": 100,
+                "price": 0.65,  # Cost = 65
+            }),
+        )
         
         # Calculate balance
         # 10000 - (100 * 0.65) = 9935
         # Actual implementation may vary
 
+    @pytest.mark.skip(reason="no assertion yet; grouping is covered by test_positions_grouped_with_average_cost")
     @pytest.mark.asyncio
     async def test_aggregate_positions_groups_by_market_outcome(self, mock_trading_db):
         """Positions should be aggregated by market and outcome."""
@@ -207,43 +246,176 @@ class TestPortfolioServiceCalculations:
         
         # Aggregated position should be 150 Yes on market-a
 
+    @pytest.mark.asyncio
+    async def test_portfolio_summary_values_open_positions(self, mock_trading_db, mock_markets_db):
+        """Summary should value open positions at market price with average cost basis."""
+        from bson import ObjectId
+        
+        portfolio_id = ObjectId()
+        base = {"portfolio_id": str(portfolio_id), "market_id": "market-a", "outcome": "Yes"}
+        await asyncio.gather(
+            mock_trading_db.portfolios.insert_one({
+                "_id": portfolio_id,
+                "user_id": "user_id",
+                "name": "Main",
+                "initial_balance": 1000.0,
+                "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            }),
+            mock_markets_db.markets.insert_one({
+                "slug": "market-a",
+                "condition_id": "0xabc",
+                "question": "Will A happen?",
+                "outcomes": ["Yes", "No"],
+                "outcome_prices": ["0.80", "0.20"],
+            }),
+            mock_trading_db.trades.insert_many([
+                {**base, "side": "buy", "quantity": 100, "price": 0.40,
+                 "trade_timestamp": datetime(2025, 1, 2, tzinfo=timezone.utc)},
+                {**base, "side": "sell", "quantity": 50, "price": 0.60,
+                 "trade_timestamp": datetime(2025, 1, 3, tzinfo=timezone.utc)},
+                {**base, "outcome": "No", "side": "buy", "quantity": 10, "price": 0.30,
+                 "trade_timestamp": datetime(2025, 1, 4, tzinfo=timezone.utc)},
+                {**base, "outcome": "No", "side": "sell", "quantity": 10, "price": 0.30,
+                 "trade_timestamp": datetime(2025, 1, 5, tzinfo=timezone.utc)},
+            ]),
+        )
+        
+        service = PortfolioService(mock_trading_db, mock_markets_db)
+        summary = await service.get_portfolio_summary(str(portfolio_id), "user_id")
+        
+        # Closed "No" position is dropped
+        assert len(summary.positions) == 1
+        pos = summary.positions[0]
+        assert pos.market_question == "Will A happen?"
+        assert pos.qty == pytest.approx(50)
+        assert pos.current_price == pytest.approx(0.80)
+        assert pos.cost_basis == pytest.approx(20.0)
+        assert pos.performance == pytest.approx(100.0)
+        # Cash: 1000 - 40 + 30 - 3 + 3 = 990, exposure 50 * 0.80 = 40
+        assert summary.cash_balance == pytest.approx(990.0)
+        assert summary.total_value == pytest.approx(1030.0)
+        assert summary.performance == pytest.approx(3.0)
+
+    @pytest.mark.asyncio
+    async def test_market_docs_matched_by_slug_or_condition_id(self, mock_trading_db, mock_markets_db):
+        """Market documents should be fetched in one query and keyed by the requested IDs."""
+        await mock_markets_db.markets.insert_many([
+            {"slug": "market-a", "condition_id": "0xaaa", "question": "A?"},
+            {"slug": "market-b", "condition_id": "0xbbb", "question": "B?"},
+        ])
+        service = PortfolioService(mock_trading_db, mock_markets_db)
+        
+        docs = await service._get_market_docs(["market-a", "0xbbb", "missing"])
+        
+        assert set(docs) == {"market-a", "0xbbb"}
+        assert docs["market-a"]["question"] == "A?"
+        assert docs["0xbbb"]["question"] == "B?"
+        assert await service._get_market_docs([]) == {}
+
+    @pytest.mark.asyncio
+    async def test_portfolio_summary_unknown_portfolio_returns_none(self, mock_trading_db):
+        """Summary for a missing portfolio should be None."""
+        service = PortfolioService(mock_trading_db)
+        assert await service.get_portfolio_summary("000000000000000000000000", "user_id") is None
+
+    @pytest.mark.asyncio
+    async def test_positions_grouped_with_average_cost(self, mock_trading_db):
+        """Positions should be grouped per (market, outcome) with order-aware cost basis."""
+        from bson import ObjectId
+        
+        portfolio_id = ObjectId()
+        await mock_trading_db.portfolios.insert_one({
+            "_id": portfolio_id,
+            "user_id": "user_id",
+            "name": "Main",
+            "initial_balance": 1000.0,
+            "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        })
+        base = {"portfolio_id": str(portfolio_id), "market_id": "market-a", "outcome": "Yes"}
+        # Inserted out of order: the sell happens after both buys
+        await mock_trading_db.trades.insert_many([
+            {**base, "side": "sell", "quantity": 5, "price": 0.90,
+             "trade_timestamp": datetime(2025, 1, 4, tzinfo=timezone.utc)},
+            {**base, "side": "buy", "quantity": 10, "price": 0.40,
+             "trade_timestamp": datetime(2025, 1, 2, tzinfo=timezone.utc)},
+            {**base, "side": "buy", "quantity": 10, "price": 0.60,
+             "trade_timestamp": datetime(2025, 1, 3, tzinfo=timezone.utc)},
+            {**base, "outcome": "No", "side": "buy", "quantity": 2, "price": 0.50,
+             "trade_timestamp": datetime(2025, 1, 5, tzinfo=timezone.utc)},
+        ])
+        
+        service = PortfolioService(mock_trading_db)
+        positions = await service.get_positions(str(portfolio_id), "user_id")
+        
+        assert [(p.market_id, p.outcome) for p in positions] == [
+            ("market-a", "Yes"), ("market-a", "No"),
+        ]
+        yes = positions[0]
+        assert yes.quantity == pytest.approx(15)
+        assert yes.notional == pytest.approx(4 + 6 - 4.5)
+        assert yes.trade_count == 3
+        # Average cost 0.50 before the sale: 10 - 5 * 0.50
+        assert yes.cost_basis == pytest.approx(7.5)
+        
+        # Sell the "No" leg and only the open position is returned
+        await mock_trading_db.trades.insert_one(
+            {**base, "outcome": "No", "side": "sell", "quantity": 2, "price": 0.50,
+             "trade_timestamp": datetime(2025, 1, 6, tzinfo=timezone.utc)},
+        )
+        open_positions = await service.get_positions(str(portfolio_id), "user_id", open_only=True)
+        assert [(p.market_id, p.outcome) for p in open_positions] == [("market-a", "Yes")]
+        
+        # Filtering by market only reads trades on those markets
+        await mock_trading_db.trades.insert_one(
+            {**base, "market_id": "market-b", "side": "buy", "quantity": 1, "price": 0.20,
+             "trade_timestamp": datetime(2025, 1, 7, tzinfo=timezone.utc)},
+        )
+        market_b = await service.get_positions(str(portfolio_id), "user_id", market_ids=["market-b"])
+        assert [(p.market_id, p.outcome) for p in market_b] == [("market-b", "Yes")]
+        assert await service.get_positions("000000000000000000000000", "user_id") is None
+
 
 # =============================================================================
 # PolymarketAPI Tests
 # =============================================================================
 
+_GAMMA_RAW = {
+    "id": "12345",
+    "slug": "test-market",
+    "question": "Will X happen?",
+    "outcomes": '["Yes", "No"]',  # JSON string
+    "outcomePrices": '["0.65", "0.35"]',  # JSON string
+    "clobTokenIds": '["token1", "token2"]',  # JSON string
+    "volumeNum": 1000000,
+    "volume24hr": 50000,
+    "liquidityNum": 100000,
+    "closed": False,
+    "active": True,
+}
+
+
+@pytest.fixture(scope="module")
+def gamma_parsed():
+    """Outcomes, prices and token IDs decoded from the Gamma API response."""
+    return (
+        json.loads(_GAMMA_RAW["outcomes"]),
+        json.loads(_GAMMA_RAW["outcomePrices"]),
+        json.loads(_GAMMA_RAW["clobTokenIds"]),
+    )
+
+
 class TestPolymarketAPIParsing:
     """Tests for PolymarketAPI response parsing."""
 
-    @pytest.mark.asyncio
-    async def test_parse_gamma_api_response_extracts_fields(self):
+    def test_parse_gamma_api_response_extracts_fields(self, gamma_parsed):
         """Gamma API response should be parsed correctly."""
-        raw_response = {
-            "id": "12345",
-            "slug": "test-market",
-            "question": "Will X happen?",
-            "outcomes": '["Yes", "No"]',  # JSON string
-            "outcomePrices": '["0.65", "0.35"]',  # JSON string
-            "clobTokenIds": '["token1", "token2"]',  # JSON string
-            "volumeNum": 1000000,
-            "volume24hr": 50000,
-            "liquidityNum": 100000,
-            "closed": False,
-            "active": True,
-        }
-        
-        # Parse the JSON strings
-        import json
-        outcomes = json.loads(raw_response["outcomes"])
-        prices = json.loads(raw_response["outcomePrices"])
-        tokens = json.loads(raw_response["clobTokenIds"])
+        outcomes, prices, tokens = gamma_parsed
         
         assert outcomes == ["Yes", "No"]
         assert len(prices) == 2
         assert len(tokens) == 2
 
-    @pytest.mark.asyncio
-    async def test_parse_clob_prices_returns_history_array(self):
+    def test_parse_clob_prices_returns_history_array(self):
         """CLOB price history should be parsed to array."""
         raw_history = [
             {"t": 1696118400, "p": 0.52},
@@ -10,10 +10,13 @@ These tests cover:
 Note: The push_live_data functionality is a placeholder and not tested.
 """
 
+import orjson
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
 
+from app.routers.ws import ConnectionManager
+
 
 class TestWebSocketConnection:
     """Tests for WebSocket connection handling."""
@@ -168,8 +171,6 @@ class TestConnectionManager:
 
     def test_manager_tracks_active_connections(self):
         """ConnectionManager should track active connections."""
-        from app.routers.ws import ConnectionManager
-        
         manager = ConnectionManager()
         
         # Initially empty
@@ -178,8 +179,6 @@ class TestConnectionManager:
 
     def test_manager_subscribe_adds_to_subscriptions(self):
         """Subscribe should add markets to user's subscription set."""
-        from app.routers.ws import ConnectionManager
-        
         manager = ConnectionManager()
         user_id = "test_user"
         
@@ -190,11 +189,10 @@ class TestConnectionManager:
         
         assert "market-1" in manager.subscriptions[user_id]
         assert "market-2" in manager.subscriptions[user_id]
+        assert manager.get_subscribed_users("market-1") == {user_id}
 
     def test_manager_unsubscribe_removes_from_subscriptions(self):
         """Unsubscribe should remove markets from subscription set."""
-        from app.routers.ws import ConnectionManager
-        
         manager = ConnectionManager()
         user_id = "test_user"
         
@@ -207,32 +205,61 @@ class TestConnectionManager:
 
     def test_manager_get_subscribed_users_returns_correct_users(self):
         """get_subscribed_users should return users subscribed to market."""
-        from app.routers.ws import ConnectionManager
-        
         manager = ConnectionManager()
         
-        manager.subscriptions["user1"] = {"market-a", "market-b"}
-        manager.subscriptions["user2"] = {"market-b", "market-c"}
-        manager.subscriptions["user3"] = {"market-c"}
+        subscribed = {
+            "user1": ["market-a", "market-b"],
+            "user2": ["market-b", "market-c"],
+            "user3": ["market-c"],
+        }
+        for user_id, market_ids in subscribed.items():
+            manager.subscriptions[user_id] = set()
+            manager.subscribe(user_id, market_ids)
         
         users = manager.get_subscribed_users("market-b")
         
         assert "user1" in users
         assert "user2" in users
         assert "user3" not in users
+        
+        manager.unsubscribe("user1", ["market-b"])
+        manager.disconnect("user2")
+        assert not manager.get_subscribed_users("market-b")
+        assert "market-b" not in manager.market_subscribers
 
     def test_manager_disconnect_removes_user(self):
         """Disconnect should remove user from connections and subscriptions."""
-        from app.routers.ws import ConnectionManager
-        
         manager = ConnectionManager()
         user_id = "test_user"
         
         # Simulate connection
         manager.active_connections[user_id] = MagicMock()
-        manager.subscriptions[user_id] = {"market-1"}
+        manager.subscriptions[user_id] = set()
+        manager.subscribe(user_id, ["market-1"])
         
         manager.disconnect(user_id)
         
         assert user_id not in manager.active_connections
         assert user_id not in manager.subscriptions
+        assert user_id not in manager.get_subscribed_users("market-1")
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_message_once(self):
+        """Broadcast should encode once and send the same text to every subscriber."""
+        manager = ConnectionManager()
+        
+        for user_id, market_id in (("user1", "market-a"), ("user2", "market-a"), ("user3", "market-b")):
+            manager.active_connections[user_id] = AsyncMock()
+            manager.subscriptions[user_id] = set()
+            manager.subscribe(user_id, [market_id])
+        
+        message = {"type": "price", "market_id": "market-a", "price": 0.5}
+        with patch("app.routers.ws.orjson.dumps", wraps=orjson.dumps) as mock_dumps:
+            await manager.broadcast_to_market("market-a", message)
+        
+        mock_dumps.assert_called_once()
+        text = orjson.dumps(message).decode()
+        manager.active_connections["user1"].send_text.assert_awaited_once_with(text)
+        manager.active_connections["user2"].send_text.assert_awaited_once_with(text)
+        manager.active_connections["user3"].send_text.assert_not_awaited()
+
@@ -8,13 +8,15 @@ This module provides shared fixtures for all tests including:
 - Fixture loading utilities with fresh timestamps
 """
 
-import json
+import asyncio
 import sys
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Generator
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
@@ -30,6 +32,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
 
+@lru_cache(maxsize=64)
+def _load_raw(filepath: Path) -> bytes:
+    """Read a fixture file once; callers parse their own copy."""
+    return filepath.read_bytes()
+
+
 def load_fixture(filename: str, subdir: str = "polymarket_responses") -> dict:
     """
     Load a JSON fixture file.
@@ -39,11 +47,10 @@ def load_fixture(filename: str, subdir: str = "polymarket_responses") -> dict:
         subdir: Subdirectory under fixtures/
         
     Returns:
-        Parsed JSON data
+        Parsed JSON data, a new object on every call
     """
     filepath = FIXTURES_DIR / subdir / filename
-    with open(filepath) as f:
-        return json.load(f)
+    return orjson.loads(_load_raw(filepath))
 
 
 def load_fixture_with_fresh_timestamps(
@@ -84,6 +91,25 @@ def load_fixture_with_fresh_timestamps(
     return data
 
 
+# =============================================================================
+# Event Loop
+# =============================================================================
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """
+    Run async tests on uvloop when it is available.
+    
+    uvloop ships with uvicorn[standard] but not on Windows, where the
+    default asyncio policy is kept.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.get_event_loop_policy()
+    return uvloop.EventLoopPolicy()
+
+
 # =============================================================================
 # MongoDB Fixtures (mongomock)
 # =============================================================================
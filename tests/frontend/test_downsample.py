@@ -0,0 +1,35 @@
+"""
+Tests for frontend/utils/downsample.py - Chart downsampling.
+
+Tests LTTB point selection on short and long series.
+"""
+import numpy as np
+
+from frontend.utils.downsample import lttb_indices
+
+
+class TestLttbIndices:
+    """Tests for lttb_indices function."""
+
+    def test_short_series_is_kept(self):
+        """Series no longer than the target should keep every point."""
+        x = np.arange(5)
+        assert list(lttb_indices(x, x * 2.0, 10)) == [0, 1, 2, 3, 4]
+        assert list(lttb_indices(x, x * 2.0, 2)) == [0, 1, 2, 3, 4]
+
+    def test_returns_requested_count_with_endpoints(self):
+        """Long series should reduce to n_out sorted points including both ends."""
+        x = np.arange(10_000, dtype=float)
+        y = np.sin(x / 100)
+        idx = lttb_indices(x, y, 500)
+        assert len(idx) == 500
+        assert idx[0] == 0
+        assert idx[-1] == len(x) - 1
+        assert np.all(np.diff(idx) > 0)
+
+    def test_keeps_spikes(self):
+        """An isolated extreme value should survive downsampling."""
+        x = np.arange(1_000, dtype=float)
+        y = np.zeros(1_000)
+        y[437] = 1.0
+        assert 437 in lttb_indices(x, y, 50)
@@ -19,6 +19,7 @@ from frontend.utils.formatters import (
     get_pnl_color,
     _normalize_outcome,
     _display_name,
+    _format_number_cached,
 )
 
 
@@ -60,6 +61,18 @@ class TestFormatNumber:
     def test_format_zero(self):
         """Zero should be formatted normally."""
         assert format_number(0) == "0.00"
+    
+    def test_repeated_values_are_memoized(self):
+        """Formatting the same value again should be served from the cache."""
+        _format_number_cached.cache_clear()
+        assert format_number(4321.0) == "4.3k"
+        assert format_number(4321.0) == "4.3k"
+        assert _format_number_cached.cache_info().hits == 1
+    
+    def test_unhashable_values_skip_the_cache(self):
+        """Unhashable input should be handled like before memoization, not raise."""
+        assert format_number([1, 2]) == "-"
+        assert format_date({"date": "2025-01-01"}) == "-"
 
 
 class TestFormatCurrency:
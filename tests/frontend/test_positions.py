@@ -0,0 +1,91 @@
+"""
+Tests for frontend/utils/positions.py - Position aggregation.
+
+Tests net quantity, notional and average cost basis computed from trades.
+"""
+import pytest
+
+from frontend.utils.positions import aggregate_positions, price_by_outcome
+
+
+class TestAggregatePositions:
+    """Tests for aggregate_positions function."""
+
+    def test_empty_trades_returns_empty_dict(self):
+        """No trades should produce no positions."""
+        assert aggregate_positions([]) == {}
+        assert aggregate_positions(None) == {}
+
+    def test_buys_accumulate_quantity_and_cost(self, sample_trades):
+        """Buys should add quantity, notional and cost."""
+        positions = aggregate_positions(sample_trades)
+        pos = positions[("fed-decision-october", "Yes")]
+        assert pos["qty"] == pytest.approx(100)
+        assert pos["notional"] == pytest.approx(55.0)
+        assert pos["cost"] == pytest.approx(55.0)
+        assert pos["count"] == 2
+
+    def test_sell_reduces_cost_at_average_price(self):
+        """Sells should reduce cost using the average cost before the sale."""
+        trades = [
+            {"market_id": "m", "outcome": "Yes", "side": "buy", "quantity": 10, "price": 0.4, "created_at": "2025-01-01"},
+            {"market_id": "m", "outcome": "Yes", "side": "sell", "quantity": 5, "price": 0.9, "created_at": "2025-01-03"},
+            {"market_id": "m", "outcome": "Yes", "side": "buy", "quantity": 10, "price": 0.6, "created_at": "2025-01-02"},
+        ]
+        pos = aggregate_positions(trades)[("m", "Yes")]
+        # Sorted: buy 10@0.4, buy 10@0.6, sell 5 -> avg 0.5, remaining cost 7.5
+        assert pos["qty"] == pytest.approx(15)
+        assert pos["cost"] == pytest.approx(7.5)
+        assert pos["notional"] == pytest.approx(4 + 6 - 4.5)
+
+    def test_cost_never_negative(self):
+        """Selling more than held should clamp cost at zero."""
+        trades = [
+            {"market_id": "m", "outcome": "No", "side": "buy", "quantity": 1, "price": 0.5, "created_at": "1"},
+            {"market_id": "m", "outcome": "No", "side": "sell", "quantity": 3, "price": 0.5, "created_at": "2"},
+        ]
+        pos = aggregate_positions(trades)[("m", "No")]
+        assert pos["qty"] == pytest.approx(-2)
+        assert pos["cost"] == 0
+
+    def test_missing_fields_use_defaults(self):
+        """Missing market, outcome and side should default like the views expect."""
+        trades = [{"quantity": 2, "price": 0.25}, "not-a-trade"]
+        pos = aggregate_positions(trades)[("N/A", "N/A")]
+        assert pos["qty"] == pytest.approx(2)
+        assert pos["count"] == 1
+
+    def test_groups_by_market_and_outcome(self):
+        """Each (market, outcome) pair should be a separate position."""
+        trades = [
+            {"market_id": "a", "outcome": "Yes", "side": "buy", "quantity": 1, "price": 0.1},
+            {"market_id": "a", "outcome": "No", "side": "buy", "quantity": 2, "price": 0.2},
+            {"market_id": "b", "outcome": "Yes", "side": "buy", "quantity": 3, "price": 0.3},
+        ]
+        positions = aggregate_positions(trades)
+        assert set(positions) == {("a", "Yes"), ("a", "No"), ("b", "Yes")}
+
+    def test_open_only_drops_closed_positions(self):
+        """open_only should keep only positions with quantity held."""
+        trades = [
+            {"market_id": "a", "outcome": "Yes", "side": "buy", "quantity": 2, "price": 0.5, "created_at": "1"},
+            {"market_id": "a", "outcome": "Yes", "side": "sell", "quantity": 2, "price": 0.6, "created_at": "2"},
+            {"market_id": "b", "outcome": "No", "side": "buy", "quantity": 1, "price": 0.3, "created_at": "3"},
+        ]
+        assert set(aggregate_positions(trades)) == {("a", "Yes"), ("b", "No")}
+        assert set(aggregate_positions(trades, open_only=True)) == {("b", "No")}
+
+
+class TestPriceByOutcome:
+    """Tests for price_by_outcome function."""
+
+    def test_maps_normalized_outcomes_to_prices(self):
+        """Outcome names should be stripped and lowercased."""
+        market = {"outcomes": [" Yes", "NO "], "outcome_prices": ["0.62", "0.38"]}
+        assert price_by_outcome(market) == {"yes": 0.62, "no": 0.38}
+
+    def test_invalid_or_missing_prices(self):
+        """Unparsable prices map to None and missing prices are skipped."""
+        market = {"outcomes": ["Yes", "No"], "outcome_prices": ["n/a"]}
+        assert price_by_outcome(market) == {"yes": None}
+        assert price_by_outcome({}) == {}